@@ -7,10 +7,12 @@ from ..tools.fundamental_data_tools import (
     get_balance_sheet,
     get_cash_flow,
 )
-from ..tools.technical_analysis_tools import get_historical_price_data, calculate_technical_indicators, plot_stock_chart
+from ..tools.technical_analysis_tools import get_historical_price_data, calculate_technical_indicators
+from ..tools.portfolio_tools import prefetch_market_data
 from ..tools.news_tools import search_news
 from ..llm import invoke_llm as call_llm
-from ..utils.shared_context import shared_context
+from ..utils.shared_context import get_shared_context
+from concurrent.futures import ThreadPoolExecutor
 import re
 # from ..graph.state import AgentState # We will define this later
 
@@ -234,9 +236,13 @@ def fundamental_analyst_agent(state: dict):
     }
     horizon_focus = _FUNDAMENTAL_HORIZON_FOCUS.get(horizon, _FUNDAMENTAL_HORIZON_FOCUS['short'])
 
-    # 1. Get the financial data using the tools (with proper date scoping)
-    financial_statements = get_financial_statements(ticker, as_of=simulated_date)
-    financial_ratios = get_financial_ratios(ticker, as_of=simulated_date)
+    # 1. Get the financial data using the tools (with proper date scoping).
+    # Statements and ratios are independent fetches, so run them side by side.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        statements_future = pool.submit(get_financial_statements, ticker, as_of=simulated_date)
+        ratios_future = pool.submit(get_financial_ratios, ticker, as_of=simulated_date)
+        financial_statements = statements_future.result()
+        financial_ratios = ratios_future.result()
     analyst_ratings = get_analyst_ratings(ticker, as_of=simulated_date)
 
     # 2. Construct the prompt for the LLM
@@ -312,6 +318,8 @@ def technical_analyst_agent(state: dict):
 
     # 1. Get the technical data using the tools
     simulated_date = state.get("simulated_date") or state.get("run_config", {}).get("simulated_date")
+    # One batched download for the ticker + ^VIX; the risk tools later hit the cache.
+    prefetch_market_data(ticker, as_of=simulated_date)
     price_data = get_historical_price_data(ticker, "1y", as_of=simulated_date)
     indicators = calculate_technical_indicators(price_data)
 
@@ -399,7 +407,7 @@ def news_harvester_agent(state: dict):
     articles = search_news(ticker, limit=50, as_of=simulated_date, lookback_days=UNIFIED_LOOKBACK_DAYS)
     
     # 2. Store in shared context for other agents to reuse
-    shared_context.set(f'news_articles_{ticker}', articles)
+    get_shared_context().set(f'news_articles_{ticker}', articles)
     
     print(f"[SHARED CONTEXT] News Harvester stored {len(articles)} news articles for {ticker}")
 
@@ -34,6 +34,10 @@ class TradingStrategy(BaseModel):
     rationale: str
 
 
+class SignalBatch(BaseModel):
+    signals: list[Literal["BUY", "SELL", "HOLD"]]
+
+
 def _extract_confidence_band(rationale: str) -> str:
     text = (rationale or "").upper()
     m = re.search(r"CONFIDENCE\s*=\s*(HIGH|MEDIUM|LOW)", text)
@@ -168,6 +172,53 @@ def _extract_json_from_text(text: str) -> str:
     return cleaned[start:end + 1]
 
 
+# Regex fast path for extract_signal. Only the tail of the text is scanned,
+# since the final recommendation is what counts.
+_SIGNAL_TAIL_CHARS = 500
+_EXPLICIT_SIGNAL_RE = re.compile(
+    r"\b(?:recommend(?:ation)?|action|decision|signal)\b\W{0,20}(?:is\s+)?\W{0,3}(BUY|SELL|HOLD)\b",
+    re.IGNORECASE,
+)
+# exit/reduce only count with position wording ("exiting positions", "reduce
+# our exposure"), not in "reduced risk" or "exiting a downtrend"
+_POSITION_WORDS = r"(?:(?:the|our|your|this|that|all|some)\s+)?(?:positions?|exposure)"
+_SIGNAL_WORDS_RE = re.compile(
+    r"\b(?:"
+    r"(?P<BUY>buy|accumulat\w*|go\s+long|bullish)"
+    r"|(?P<SELL>sell|exit(?:ing)?\s+" + _POSITION_WORDS
+    + r"|reduc(?:e|ing)\s+" + _POSITION_WORDS + r"|go\s+short|bearish)"
+    r"|(?P<HOLD>hold|wait(?:-and-see)?|neutral)"
+    r")\b",
+    re.IGNORECASE,
+)
+_NEGATION_RE = re.compile(r"\b(?:not|never|avoid)\b|n't\b", re.IGNORECASE)
+
+
+def _regex_signal(text: str) -> Optional[str]:
+    """
+    Classify unambiguous text without an LLM call; None when unsure.
+
+    Returns the last explicit recommendation ("recommend BUY", "Action: SELL",
+    "Final Recommendation: HOLD"), else the only signal class with at least two
+    synonym hits. Negations anywhere in the tail send the text to the LLM.
+    """
+    tail = text[-_SIGNAL_TAIL_CHARS:]
+    if _NEGATION_RE.search(tail):
+        return None
+
+    explicit = _EXPLICIT_SIGNAL_RE.findall(tail)
+    if explicit:
+        return explicit[-1].upper()
+
+    hits = {"BUY": 0, "SELL": 0, "HOLD": 0}
+    for match in _SIGNAL_WORDS_RE.finditer(tail):
+        hits[match.lastgroup] += 1
+    found = [signal for signal, count in hits.items() if count]
+    if len(found) == 1 and hits[found[0]] >= 2:
+        return found[0]
+    return None
+
+
 def extract_signal(text: str, ticker: str = "Unknown") -> str:
     """
     LLM-based signal extractor that replaces fragile keyword matching.
@@ -181,6 +232,9 @@ def extract_signal(text: str, ticker: str = "Unknown") -> str:
     - Ambiguous phrasing ("accumulate positions" → BUY)
     - Multi-paragraph responses
     
+    Unambiguous text is classified by _regex_signal first; only the rest
+    goes to the LLM.
+    
     Args:
         text: The raw text response from an agent
         ticker: The ticker symbol (for context)
@@ -188,6 +242,10 @@ def extract_signal(text: str, ticker: str = "Unknown") -> str:
     Returns:
         One of: "BUY", "SELL", or "HOLD"
     """
+    fast_signal = _regex_signal(text or "")
+    if fast_signal is not None:
+        return fast_signal
+
     prompt = f"""Extract the trading signal from this analysis for {ticker}.
 
 ANALYSIS TEXT:
@@ -223,6 +281,58 @@ Return ONLY: BUY, SELL, or HOLD (no punctuation, no explanation)"""
         return "HOLD"
 
 
+def extract_signals_batch(texts: list[str], ticker: str = "Unknown") -> list[str]:
+    """
+    Batch version of extract_signal: one structured LLM call for all texts.
+
+    Texts the regex fast path can classify skip the LLM entirely. Falls back
+    to per-text extract_signal if the batched call fails or returns the wrong
+    number of signals.
+
+    Args:
+        texts: Raw text responses to classify
+        ticker: The ticker symbol (for context)
+
+    Returns:
+        One of "BUY", "SELL", or "HOLD" per input text, in order
+    """
+    signals: list[Optional[str]] = [_regex_signal(text or "") for text in texts]
+    pending = [i for i, signal in enumerate(signals) if signal is None]
+    if not pending:
+        return signals
+    texts_for_llm = [texts[i] for i in pending]
+
+    sections = "\n\n".join(
+        f"--- ANALYSIS {i} ---\n{text}" for i, text in enumerate(texts_for_llm, 1)
+    )
+    prompt = f"""Extract the trading signal from each of the following {len(texts_for_llm)} analyses for {ticker}.
+
+{sections}
+
+INSTRUCTIONS:
+- Return one signal per analysis, in order: BUY, SELL, or HOLD
+- Look for explicit recommendations ("I recommend...", "Action: ...", "Decision: ...")
+- Interpret synonyms:
+  - BUY signals: "buy", "long", "accumulate", "add", "bullish", "go long"
+  - SELL signals: "sell", "short", "exit", "reduce", "bearish", "go short"
+  - HOLD signals: "hold", "wait", "neutral", "no action", "uncertain"
+- If multiple signals exist in one analysis, prioritize its FINAL recommendation
+- If an analysis is truly ambiguous, use HOLD
+
+Return JSON: {{"signals": [...]}} with exactly {len(texts_for_llm)} entries."""
+
+    try:
+        batch = call_llm_structured(prompt, SignalBatch, temperature=0.0, call_name="Signal_Extractor_Batch")
+        llm_signals = list(batch.signals)
+    except Exception:
+        llm_signals = []
+    if len(llm_signals) != len(texts_for_llm):
+        llm_signals = [extract_signal(text, ticker) for text in texts_for_llm]
+    for i, signal in zip(pending, llm_signals):
+        signals[i] = signal
+    return signals
+
+
 def trading_strategy_synthesizer_agent(state: dict):
     """
     The Trader Agent (formerly "Strategy Synthesizer").
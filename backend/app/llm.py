@@ -9,6 +9,7 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 import requests
+from requests.adapters import HTTPAdapter
 import threading
 
 # Load environment variables
@@ -36,6 +37,12 @@ _call_stats: dict = {"total_calls": 0, "retries": 0, "rate_limits_429": 0}
 # Control via LLM_MAX_CONCURRENT env var (default 8).
 _llm_semaphore = threading.Semaphore(int("16"))
 
+# Shared keep-alive pool for REST calls, sized above the semaphore so every
+# in-flight worker reuses a warm TLS connection. No adapter retries: the
+# call loop below owns retry/backoff.
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
 def reset_token_log():
     """Clear the token log for a new run."""
     global _token_log
@@ -254,7 +261,7 @@ def _invoke_vertex_api_key(
                 model,
             )
             with _llm_semaphore:
-                response = requests.post(url, json=payload, timeout=90)
+                response = _HTTP_SESSION.post(url, json=payload, timeout=90)
             if response.status_code == 429:
                 _call_stats["rate_limits_429"] += 1
                 if attempt < max_retries:
@@ -7,11 +7,12 @@ from fastapi import FastAPI
 from fastapi import HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from .graph.agent_graph import create_agent_graph
 from .utils.memory import initialize_memory, get_memory
 from .utils.run_archive import initialize_run_archive, get_run_archive
+from .utils.shared_context import initialize_context
 from .utils.stage_a_cache import (
     build_stage_a_cache_key,
     extract_cached_reports,
@@ -334,8 +335,9 @@ def analyze_ticker(request: AnalysisRequest):
         cached_stage_a_trace=cached_stage_a_trace,
     )
 
-    # Invoke the graph
+    # Invoke the graph (with a fresh shared context for this request only)
     print(f"Invoking the agent graph for {request.ticker}...")
+    initialize_context()
     final_state = agent_graph.invoke(initial_state)
 
     # Record timing
@@ -441,6 +443,7 @@ async def analyze_ticker_stream(
             start_time = time.time()
             reset_call_stats()
             reset_token_log()
+            initialize_context()
             
             # Send initial status
             event_data = json.dumps({'status': 'started', 'message': f'Starting analysis for {ticker}...'})
@@ -550,7 +553,8 @@ async def analyze_ticker_stream(
                     final_state_json = json.dumps(final_state, default=str)
 
                     memory = get_memory()
-                    memory_id = memory.store_analysis(
+                    # Off the event loop: embedding/indexing must not stall other streams
+                    memory_id = await memory.astore_analysis(
                         ticker=ticker,
                         analysis_summary=f"Analysis completed for {ticker}",
                         bull_arguments=final_state.get('investment_debate_state', {}).get('bull_history', 'N/A'),
@@ -607,12 +611,14 @@ async def analyze_ticker_stream(
 def read_root():
     return {"message": "Welcome to the NexusTrader API"}
 
-@app.get("/api/chart/{ticker}")
+@app.get("/api/chart/{ticker}", response_class=ORJSONResponse)
 def get_chart_data(ticker: str, period: str = "6mo", as_of: Optional[str] = None):
     """Return OHLCV data for frontend chart rendering."""
     try:
         data = get_chart_data_json(ticker, period=period, as_of=as_of)
-        return {"status": "success", "ticker": ticker, "data": data}
+        # The bars are already plain str/float/int, so hand them straight to orjson
+        # instead of walking them again through jsonable_encoder + json.dumps.
+        return ORJSONResponse({"status": "success", "ticker": ticker, "data": data})
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
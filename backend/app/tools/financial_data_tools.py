@@ -1,14 +1,17 @@
 # In nexustrader/backend/app/tools/financial_data_tools.py
+import logging
 import yfinance as yf
 import json
 from ..utils.cache import cache_data
 
+logger = logging.getLogger(__name__)
+
 @cache_data(ttl_seconds=3600)  # Cache for 1 hour
 def get_financial_statements(ticker: str):
     """
     Returns the company's income statement, balance sheet, and cash flow statement.
     """
-    print(f"Fetching financial statements for {ticker}...")
+    logger.debug("Fetching financial statements for %s", ticker)
     stock = yf.Ticker(ticker)
     
     # Convert DataFrames to JSON strings for LLM processing
@@ -27,7 +30,7 @@ def get_financial_ratios(ticker: str):
     """
     Returns a dictionary of key financial ratios.
     """
-    print(f"Fetching financial ratios for {ticker}...")
+    logger.debug("Fetching financial ratios for %s", ticker)
     stock_info = yf.Ticker(ticker).info
     
     # Extract a selection of key ratios
@@ -51,7 +54,7 @@ def get_analyst_ratings(ticker: str):
     """
     Returns a summary of analyst ratings for the stock.
     """
-    print(f"Fetching analyst ratings for {ticker}...")
+    logger.debug("Fetching analyst ratings for %s", ticker)
     stock = yf.Ticker(ticker)
     
     # Convert recommendations DataFrame to JSON
@@ -64,7 +67,7 @@ def get_key_valuation_metrics(ticker: str):
     """
     Returns a dictionary of key valuation metrics.
     """
-    print(f"Fetching key valuation metrics for {ticker}...")
+    logger.debug("Fetching key valuation metrics for %s", ticker)
     stock_info = yf.Ticker(ticker).info
     
     metrics = {
@@ -11,18 +11,29 @@ This ensures:
 """
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import yfinance as yf
 
 from app.utils.cache import cache_data
+from app.utils.dates import parse_iso_date
 
 # ── Cache Location ─────────────────────────────────────────────────────
 CACHE_DIR = Path(__file__).parent.parent.parent.parent / "experiments" / "cache" / "fundamentals"
 
 
+@cache
+def _fund_dir(ticker_upper: str) -> str:
+    """Per-ticker fundamentals directory as a plain str, built once per ticker."""
+    return os.fspath(CACHE_DIR / ticker_upper)
+
+
 def _load_frozen_fundamentals(ticker: str, function: str) -> dict | None:
     """
     Load frozen fundamental data from disk.
@@ -32,13 +43,21 @@ def _load_frozen_fundamentals(ticker: str, function: str) -> dict | None:
         function: One of 'income_statement', 'balance_sheet', 'cash_flow'
     
     Returns:
-        Full Alpha Vantage response or None if not cached
+        Full Alpha Vantage response or None if not cached. The parsed dict is
+        shared between calls, so treat it as read-only.
     """
-    cache_file = CACHE_DIR / ticker.upper() / f"{function}.json"
+    cache_file = os.path.join(_fund_dir(ticker.upper()), f"{function}.json")
     
-    if not cache_file.exists():
+    try:
+        mtime_ns = os.stat(cache_file).st_mtime_ns
+    except OSError:
         return None
-    
+    return _parse_frozen_file(cache_file, mtime_ns)
+
+
+@lru_cache(maxsize=64)
+def _parse_frozen_file(cache_file: str, mtime_ns: int) -> dict | None:
+    """Parse one frozen file once; the mtime in the key picks up a re-freeze."""
     try:
         with open(cache_file, "r", encoding="utf-8") as f:
             cached = json.load(f)
@@ -77,18 +96,67 @@ def _filter_by_date(reports: list[dict], as_of: str | None) -> list[dict]:
     return sorted(filtered, key=lambda x: x.get("fiscalDateEnding", ""), reverse=True)
 
 
+def _latest_report_on_or_before(reports: list[dict], cutoff: str | None) -> dict:
+    """
+    Return the newest report with fiscalDateEnding <= cutoff in a single pass.
+
+    Args:
+        reports: List of annual or quarterly reports with 'fiscalDateEnding'
+        cutoff: 'YYYY-MM-DD' string. If None, returns the newest report overall.
+
+    Returns:
+        The matching report, or {} if none qualifies
+    """
+    best: dict | None = None
+    best_key = ""
+    for report in reports:
+        fiscal_date = report.get("fiscalDateEnding") or ""
+        if (cutoff is None or fiscal_date <= cutoff) and fiscal_date > best_key:
+            best_key, best = fiscal_date, report
+    return best or {}
+
+
+def _canonical_args(ticker: str, as_of: str | None) -> tuple[str, str | None]:
+    """Uppercase ticker and date-only as_of, so timestamp variants share one cache entry."""
+    return ticker.upper(), (as_of[:10] if as_of else None)
+
+
 def _is_historical_date(as_of: str | None) -> bool:
     """Check if as_of is a historical date (not today or None)."""
     if as_of is None:
         return False
     try:
-        as_of_date = datetime.fromisoformat(as_of).date()
-        return as_of_date < date.today()
+        return parse_iso_date(as_of) < date.today()
     except (ValueError, TypeError):
         return False
 
 
-def _get_yfinance_live_statements(ticker: str) -> dict[str, Any]:
+def _latest_report_from_df(df) -> dict[str, str]:
+    """Alpha Vantage-like report for the newest period column only ({} if empty)."""
+    if df is None or df.empty:
+        return {}
+    date_col = df.columns.max()
+    report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
+    report.update(zip(map(str, df.index), map(str, df[date_col].tolist())))
+    return report
+
+
+def _reports_from_df(df, latest_only: bool = False) -> list[dict[str, str]]:
+    """Convert a yfinance statement DataFrame (rows=items, cols=periods) to report dicts."""
+    if df is None or df.empty:
+        return []
+    if latest_only:
+        return [_latest_report_from_df(df)]
+    reports = []
+    for date_col in df.columns:
+        report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
+        for idx in df.index:
+            report[str(idx)] = str(df.loc[idx, date_col])
+        reports.append(report)
+    return reports
+
+
+def _get_yfinance_live_statements(ticker: str, latest_only: bool = False) -> dict[str, Any]:
     """Fetch current income statement from yfinance."""
     try:
         stock = yf.Ticker(ticker)
@@ -96,21 +164,8 @@ def _get_yfinance_live_statements(ticker: str) -> dict[str, Any]:
         quarterly = stock.quarterly_financials
         
         # Convert DataFrame to Alpha Vantage-like format
-        annual_reports = []
-        if financials is not None and not financials.empty:
-            for date_col in financials.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in financials.index:
-                    report[str(idx)] = str(financials.loc[idx, date_col])
-                annual_reports.append(report)
-        
-        quarterly_reports = []
-        if quarterly is not None and not quarterly.empty:
-            for date_col in quarterly.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in quarterly.index:
-                    report[str(idx)] = str(quarterly.loc[idx, date_col])
-                quarterly_reports.append(report)
+        annual_reports = _reports_from_df(financials, latest_only)
+        quarterly_reports = _reports_from_df(quarterly, latest_only)
         
         return {
             "symbol": ticker,
@@ -127,7 +182,6 @@ def _get_yfinance_live_statements(ticker: str) -> dict[str, Any]:
         }
 
 
-@cache_data(ttl_seconds=3600)
 def get_financial_statements(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     """
     Get income statement for a ticker.
@@ -143,6 +197,11 @@ def get_financial_statements(ticker: str, as_of: str | None = None) -> dict[str,
     Returns:
         Income statement data with annualReports and quarterlyReports
     """
+    return _get_financial_statements_impl(*_canonical_args(ticker, as_of))
+
+
+@cache_data(ttl_seconds=3600)
+def _get_financial_statements_impl(ticker: str, as_of: str | None) -> dict[str, Any]:
     if not _is_historical_date(as_of):
         return _get_yfinance_live_statements(ticker)
 
@@ -164,28 +223,15 @@ def get_financial_statements(ticker: str, as_of: str | None = None) -> dict[str,
     }
 
 
-def _get_yfinance_live_balance_sheet(ticker: str) -> dict[str, Any]:
+def _get_yfinance_live_balance_sheet(ticker: str, latest_only: bool = False) -> dict[str, Any]:
     """Fetch current balance sheet from yfinance."""
     try:
         stock = yf.Ticker(ticker)
         balance_sheet = stock.balance_sheet  # Annual
         quarterly = stock.quarterly_balance_sheet
         
-        annual_reports = []
-        if balance_sheet is not None and not balance_sheet.empty:
-            for date_col in balance_sheet.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in balance_sheet.index:
-                    report[str(idx)] = str(balance_sheet.loc[idx, date_col])
-                annual_reports.append(report)
-        
-        quarterly_reports = []
-        if quarterly is not None and not quarterly.empty:
-            for date_col in quarterly.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in quarterly.index:
-                    report[str(idx)] = str(quarterly.loc[idx, date_col])
-                quarterly_reports.append(report)
+        annual_reports = _reports_from_df(balance_sheet, latest_only)
+        quarterly_reports = _reports_from_df(quarterly, latest_only)
         
         return {
             "symbol": ticker,
@@ -202,7 +248,6 @@ def _get_yfinance_live_balance_sheet(ticker: str) -> dict[str, Any]:
         }
 
 
-@cache_data(ttl_seconds=3600)
 def get_balance_sheet(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     """
     Get balance sheet for a ticker.
@@ -218,6 +263,11 @@ def get_balance_sheet(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     Returns:
         Balance sheet data with annualReports and quarterlyReports
     """
+    return _get_balance_sheet_impl(*_canonical_args(ticker, as_of))
+
+
+@cache_data(ttl_seconds=3600)
+def _get_balance_sheet_impl(ticker: str, as_of: str | None) -> dict[str, Any]:
     if not _is_historical_date(as_of):
         return _get_yfinance_live_balance_sheet(ticker)
     
@@ -239,28 +289,15 @@ def get_balance_sheet(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     }
 
 
-def _get_yfinance_live_cashflow(ticker: str) -> dict[str, Any]:
+def _get_yfinance_live_cashflow(ticker: str, latest_only: bool = False) -> dict[str, Any]:
     """Fetch current cash flow from yfinance."""
     try:
         stock = yf.Ticker(ticker)
         cashflow = stock.cashflow  # Annual
         quarterly = stock.quarterly_cashflow
         
-        annual_reports = []
-        if cashflow is not None and not cashflow.empty:
-            for date_col in cashflow.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in cashflow.index:
-                    report[str(idx)] = str(cashflow.loc[idx, date_col])
-                annual_reports.append(report)
-        
-        quarterly_reports = []
-        if quarterly is not None and not quarterly.empty:
-            for date_col in quarterly.columns:
-                report = {"fiscalDateEnding": date_col.strftime("%Y-%m-%d")}
-                for idx in quarterly.index:
-                    report[str(idx)] = str(quarterly.loc[idx, date_col])
-                quarterly_reports.append(report)
+        annual_reports = _reports_from_df(cashflow, latest_only)
+        quarterly_reports = _reports_from_df(quarterly, latest_only)
         
         return {
             "symbol": ticker,
@@ -277,7 +314,6 @@ def _get_yfinance_live_cashflow(ticker: str) -> dict[str, Any]:
         }
 
 
-@cache_data(ttl_seconds=3600)
 def get_cash_flow(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     """
     Get cash flow statement for a ticker.
@@ -293,6 +329,11 @@ def get_cash_flow(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     Returns:
         Cash flow data with annualReports and quarterlyReports
     """
+    return _get_cash_flow_impl(*_canonical_args(ticker, as_of))
+
+
+@cache_data(ttl_seconds=3600)
+def _get_cash_flow_impl(ticker: str, as_of: str | None) -> dict[str, Any]:
     if not _is_historical_date(as_of):
         return _get_yfinance_live_cashflow(ticker)
 
@@ -314,7 +355,55 @@ def get_cash_flow(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     }
 
 
+_STATEMENT_FUNCTIONS = ("income_statement", "balance_sheet", "cash_flow")
+
+_LIVE_LATEST_FETCHERS = {
+    "income_statement": _get_yfinance_live_statements,
+    "balance_sheet": _get_yfinance_live_balance_sheet,
+    "cash_flow": _get_yfinance_live_cashflow,
+}
+
+
 @cache_data(ttl_seconds=3600)
+def _fetch_live_latest(function: str, ticker: str) -> dict[str, Any]:
+    """Live yfinance statement reduced to its newest annual/quarterly report."""
+    return _LIVE_LATEST_FETCHERS[function](ticker.upper(), latest_only=True)
+
+
+def _load_all_frozen(ticker: str, functions: tuple[str, ...] = _STATEMENT_FUNCTIONS) -> dict[str, dict]:
+    """Load several frozen statements for a ticker at once; missing files map to {}."""
+    return {function: _load_frozen_fundamentals(ticker, function) or {} for function in functions}
+
+
+def _latest_statement_reports(
+    ticker: str,
+    as_of: str | None,
+    period_key: str,
+    functions: tuple[str, ...] = _STATEMENT_FUNCTIONS,
+) -> list[dict]:
+    """
+    Newest report per statement as of the given date, without building filtered lists.
+
+    Args:
+        ticker: Stock ticker symbol
+        as_of: ISO date string for point-in-time data
+        period_key: 'annualReports' or 'quarterlyReports'
+        functions: Statements to read, in the order results are returned
+
+    Returns:
+        One report dict per function ({} where unavailable)
+    """
+    if _is_historical_date(as_of):
+        frozen = _load_all_frozen(ticker, functions)
+        cutoff = as_of[:10]
+        return [_latest_report_on_or_before(frozen[f].get(period_key, []), cutoff) for f in functions]
+
+    # Each statement is its own Yahoo round trip; issue them concurrently
+    with ThreadPoolExecutor(max_workers=len(functions)) as pool:
+        live = list(pool.map(lambda f: _fetch_live_latest(f, ticker), functions))
+    return [_latest_report_on_or_before(data.get(period_key, []), None) for data in live]
+
+
 def get_financial_ratios(ticker: str, as_of: str | None = None) -> dict[str, Any]:
     """
     Calculate key financial ratios from the most recent statements as of the given date.
@@ -326,56 +415,93 @@ def get_financial_ratios(ticker: str, as_of: str | None = None) -> dict[str, Any
     Returns:
         Dictionary of calculated ratios
     """
-    income = get_financial_statements(ticker, as_of)
-    balance = get_balance_sheet(ticker, as_of)
-    cash_flow = get_cash_flow(ticker, as_of)
-    
+    return _get_financial_ratios_impl(*_canonical_args(ticker, as_of))
+
+
+# (statement index, field) per column: 0=income, 1=balance, 2=cash flow
+_RATIO_FIELDS = (
+    (0, "totalRevenue"),
+    (0, "netIncome"),
+    (1, "totalAssets"),
+    (1, "totalShareholderEquity"),
+    (1, "totalCurrentAssets"),
+    (1, "totalCurrentLiabilities"),
+    (2, "operatingCashflow"),
+)
+
+
+def _safe_float(value: str | None) -> float:
+    """Convert string to float, return 0 if invalid."""
+    try:
+        return float(value) if value and value != "None" else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise ratio, 0 where the denominator is 0."""
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def _compute_ratio_rows(periods: list[tuple[dict, dict, dict]]) -> list[dict[str, Any]]:
+    """
+    Compute the ratio block for many (income, balance, cash flow) report triples at once.
+
+    Values are extracted into one float64 matrix and every ratio is a single
+    vectorized division; per-period dicts are only built on the way out.
+    """
+    n_fields = len(_RATIO_FIELDS)
+    values = np.fromiter(
+        (_safe_float(period[src].get(field)) for period in periods for src, field in _RATIO_FIELDS),
+        dtype=np.float64,
+        count=len(periods) * n_fields,
+    ).reshape(-1, n_fields)
+    revenue, net_income, total_assets, total_equity, current_assets, current_liabilities, operating_cashflow = values.T
+
+    columns = {
+        "netProfitMargin": _safe_divide(net_income, revenue).tolist(),
+        "returnOnAssets": _safe_divide(net_income, total_assets).tolist(),
+        "returnOnEquity": _safe_divide(net_income, total_equity).tolist(),
+        "currentRatio": _safe_divide(current_assets, current_liabilities).tolist(),
+        "operatingCashflow": operating_cashflow.tolist(),
+        "revenue": revenue.tolist(),
+        "netIncome": net_income.tolist(),
+        "totalAssets": total_assets.tolist(),
+        "totalEquity": total_equity.tolist(),
+    }
+
+    rows = []
+    for i, (income, _, _) in enumerate(periods):
+        rows.append({
+            "fiscalDateEnding": income.get("fiscalDateEnding"),
+            "profitability": {
+                "netProfitMargin": columns["netProfitMargin"][i],
+                "returnOnAssets": columns["returnOnAssets"][i],
+                "returnOnEquity": columns["returnOnEquity"][i],
+            },
+            "liquidity": {
+                "currentRatio": columns["currentRatio"][i],
+            },
+            "cashflow": {
+                "operatingCashflow": columns["operatingCashflow"][i],
+                "freeCashflow": columns["operatingCashflow"][i],  # Simplified - would need capex
+            },
+            "rawValues": {
+                "revenue": columns["revenue"][i],
+                "netIncome": columns["netIncome"][i],
+                "totalAssets": columns["totalAssets"][i],
+                "totalEquity": columns["totalEquity"][i],
+            }
+        })
+    return rows
+
+
+@cache_data(ttl_seconds=3600)
+def _get_financial_ratios_impl(ticker: str, as_of: str | None) -> dict[str, Any]:
     # Get most recent quarter for each
-    latest_income = income.get("quarterlyReports", [{}])[0] if income.get("quarterlyReports") else {}
-    latest_balance = balance.get("quarterlyReports", [{}])[0] if balance.get("quarterlyReports") else {}
-    latest_cash = cash_flow.get("quarterlyReports", [{}])[0] if cash_flow.get("quarterlyReports") else {}
-    
-    def safe_float(value: str | None) -> float:
-        """Convert string to float, return 0 if invalid."""
-        try:
-            return float(value) if value and value != "None" else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-    
-    def safe_ratio(numerator: float, denominator: float) -> float:
-        """Calculate ratio, return 0 if denominator is 0."""
-        return numerator / denominator if denominator != 0 else 0.0
+    latest_income, latest_balance, latest_cash = _latest_statement_reports(ticker, as_of, "quarterlyReports")
     
-    # Extract values
-    revenue = safe_float(latest_income.get("totalRevenue"))
-    net_income = safe_float(latest_income.get("netIncome"))
-    total_assets = safe_float(latest_balance.get("totalAssets"))
-    total_equity = safe_float(latest_balance.get("totalShareholderEquity"))
-    current_assets = safe_float(latest_balance.get("totalCurrentAssets"))
-    current_liabilities = safe_float(latest_balance.get("totalCurrentLiabilities"))
-    operating_cashflow = safe_float(latest_cash.get("operatingCashflow"))
-    
-    return {
-        "fiscalDateEnding": latest_income.get("fiscalDateEnding"),
-        "profitability": {
-            "netProfitMargin": safe_ratio(net_income, revenue),
-            "returnOnAssets": safe_ratio(net_income, total_assets),
-            "returnOnEquity": safe_ratio(net_income, total_equity),
-        },
-        "liquidity": {
-            "currentRatio": safe_ratio(current_assets, current_liabilities),
-        },
-        "cashflow": {
-            "operatingCashflow": operating_cashflow,
-            "freeCashflow": operating_cashflow,  # Simplified - would need capex
-        },
-        "rawValues": {
-            "revenue": revenue,
-            "netIncome": net_income,
-            "totalAssets": total_assets,
-            "totalEquity": total_equity,
-        }
-    }
+    return _compute_ratio_rows([(latest_income, latest_balance, latest_cash)])[0]
 
 
 def get_analyst_ratings(ticker: str, as_of: str | None = None) -> dict[str, Any]:
@@ -403,25 +529,17 @@ def get_key_valuation_metrics(ticker: str, as_of: str | None = None) -> dict[str
     Returns:
         Dictionary of key metrics
     """
-    income = get_financial_statements(ticker, as_of)
-    balance = get_balance_sheet(ticker, as_of)
-    
-    latest_annual = income.get("annualReports", [{}])[0] if income.get("annualReports") else {}
-    latest_balance = balance.get("annualReports", [{}])[0] if balance.get("annualReports") else {}
-    
-    def safe_float(value: str | None) -> float:
-        try:
-            return float(value) if value and value != "None" else 0.0
-        except (ValueError, TypeError):
-            return 0.0
+    latest_annual, latest_balance = _latest_statement_reports(
+        ticker, as_of, "annualReports", ("income_statement", "balance_sheet")
+    )
     
     return {
         "fiscalDateEnding": latest_annual.get("fiscalDateEnding"),
-        "revenue": safe_float(latest_annual.get("totalRevenue")),
-        "netIncome": safe_float(latest_annual.get("netIncome")),
-        "ebitda": safe_float(latest_annual.get("ebitda")),
-        "totalAssets": safe_float(latest_balance.get("totalAssets")),
-        "totalLiabilities": safe_float(latest_balance.get("totalLiabilities")),
-        "totalEquity": safe_float(latest_balance.get("totalShareholderEquity")),
+        "revenue": _safe_float(latest_annual.get("totalRevenue")),
+        "netIncome": _safe_float(latest_annual.get("netIncome")),
+        "ebitda": _safe_float(latest_annual.get("ebitda")),
+        "totalAssets": _safe_float(latest_balance.get("totalAssets")),
+        "totalLiabilities": _safe_float(latest_balance.get("totalLiabilities")),
+        "totalEquity": _safe_float(latest_balance.get("totalShareholderEquity")),
         "bookValuePerShare": None,  # Would need shares outstanding
     }
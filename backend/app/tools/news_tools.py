@@ -1,22 +1,63 @@
 # In nexustrader/backend/app/tools/news_tools.py
+import heapq
+import logging
 import os
-import json
-import time
 from datetime import datetime, timedelta, timezone
+from functools import cache, lru_cache
 from pathlib import Path
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..utils.cache import cache_data
+from ..utils.dates import parse_iso_date
+
+logger = logging.getLogger(__name__)
 
 
 # ── Frozen News Cache ──────────────────────────────────────────────────
-# Pre-fetched Alpha Vantage news stored as JSON files on disk.
+# Pre-fetched Alpha Vantage news stored on disk.
 # Checked BEFORE any live API call for reproducibility across date ranges.
-# Structure: experiments/cache/news/{TICKER}/{YYYY-MM-DD}.json
+# Structure: experiments/cache/news/{TICKER}.jsonl, one record per date.
+# The older experiments/cache/news/{TICKER}/{YYYY-MM-DD}.json files are still read.
 FROZEN_CACHE_DIR = Path(__file__).resolve().parents[3] / "experiments" / "cache" / "news"
 
 
+@cache
+def _news_dir(ticker_upper: str) -> str:
+    """Per-ticker legacy frozen news directory as a plain str, built once per ticker."""
+    return os.fspath(FROZEN_CACHE_DIR / ticker_upper)
+
+
+@cache
+def _news_jsonl(ticker_upper: str) -> str:
+    """Per-ticker frozen news JSONL path as a plain str, built once per ticker."""
+    return os.fspath(FROZEN_CACHE_DIR / f"{ticker_upper}.jsonl")
+
+
+@lru_cache(maxsize=64)
+def _load_frozen_jsonl_cached(jsonl_path: str, mtime_ns: int) -> dict[str, list[dict]]:
+    """Index a ticker's JSONL by date. Keyed on mtime so appended records are picked up."""
+    by_date = {}
+    with open(jsonl_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                record = orjson.loads(line)
+                # A date frozen twice keeps its latest record
+                by_date[record["date"]] = record.get("articles", [])
+    return by_date
+
+
+@lru_cache(maxsize=4096)
+def _load_frozen_news_cached(cache_path: str, mtime_ns: int) -> list[dict]:
+    """Parse a legacy frozen news file. Keyed on mtime so re-frozen files are re-read."""
+    with open(cache_path, "rb") as f:
+        data = orjson.loads(f.read())
+    return data.get("articles", [])
+
+
 def _load_frozen_news(ticker: str, as_of: str) -> list[dict] | None:
     """
     Check the frozen news cache for pre-fetched articles.
@@ -24,77 +65,110 @@ def _load_frozen_news(ticker: str, as_of: str) -> list[dict] | None:
     Returns:
         list[dict] of articles if found, None if not cached.
     """
-    # Normalize date to YYYY-MM-DD
-    date_str = as_of.split("T")[0] if as_of else None
-    if not date_str:
-        return None
-    
-    cache_path = FROZEN_CACHE_DIR / ticker.upper() / f"{date_str}.json"
-    if not cache_path.exists():
+    # Normalize date to YYYY-MM-DD (plain date or ISO timestamp prefix)
+    date_str = as_of[:10] if as_of else None
+    if not date_str or len(date_str) != 10 or date_str[4] != "-":
         return None
     
+    ticker_upper = ticker.upper()
     try:
-        with open(cache_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        articles = data.get("articles", [])
-        print(f"[FROZEN CACHE HIT] {ticker}/{date_str} — {len(articles)} articles from Alpha Vantage")
-        return articles
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"[FROZEN CACHE ERROR] {ticker}/{date_str}: {e}")
+        jsonl_path = _news_jsonl(ticker_upper)
+        try:
+            mtime_ns = os.stat(jsonl_path).st_mtime_ns
+        except OSError:
+            pass
+        else:
+            articles = _load_frozen_jsonl_cached(jsonl_path, mtime_ns).get(date_str)
+            if articles is not None:
+                return articles
+        
+        cache_path = os.path.join(_news_dir(ticker_upper), f"{date_str}.json")
+        try:
+            mtime_ns = os.stat(cache_path).st_mtime_ns
+        except OSError:
+            return None
+        return _load_frozen_news_cached(cache_path, mtime_ns)
+    except (orjson.JSONDecodeError, KeyError, IOError) as e:
+        logger.warning("[FROZEN CACHE ERROR] %s/%s: %s", ticker, date_str, e)
         return None
 
 
+# ── Finnhub HTTP Session ───────────────────────────────────────────────
+# One pooled keep-alive session for all Finnhub calls; 429/5xx and connection
+# errors are retried by urllib3 with backoff (honouring Retry-After).
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+
+
+_finnhub_api_key: str | None = None
+
+
 def _get_finnhub_api_key() -> str | None:
-    return (
-        os.getenv("FINHUB_API_KEY")
-    )
-
-
-def _heuristic_sentiment(title: str, summary: str) -> tuple[float, str]:
-    """Lightweight, deterministic sentiment proxy in [-1, 1]."""
-    text = f"{title} {summary}".lower()
-    positive = [
-        "beats",
-        "surge",
-        "soar",
-        "record",
-        "upgrade",
-        "strong",
-        "growth",
-        "profit",
-        "bull",
-        "bullish",
-        "rally",
-        "win",
-        "raises",
-        "raises guidance",
-        "acquires",
-    ]
-    negative = [
-        "miss",
-        "slump",
-        "plunge",
-        "drop",
-        "downgrade",
-        "weak",
-        "decline",
-        "loss",
-        "bear",
-        "bearish",
-        "lawsuit",
-        "probe",
-        "investigation",
-        "cut guidance",
-        "cuts guidance",
-    ]
-
-    score = 0
-    for w in positive:
-        if w in text:
-            score += 1
-    for w in negative:
-        if w in text:
-            score -= 1
+    """Finnhub key from the environment; remembered once found, re-read until then
+    (scripts may load .env after importing the tools)."""
+    global _finnhub_api_key
+    if _finnhub_api_key is None:
+        _finnhub_api_key = os.getenv("FINHUB_API_KEY") or None
+    return _finnhub_api_key
+
+
+_POSITIVE_KEYWORDS = (
+    "beats",
+    "surge",
+    "soar",
+    "record",
+    "upgrade",
+    "strong",
+    "growth",
+    "profit",
+    "bull",
+    "bullish",
+    "rally",
+    "win",
+    "raises",
+    "raises guidance",
+    "acquires",
+)
+_NEGATIVE_KEYWORDS = (
+    "miss",
+    "slump",
+    "plunge",
+    "drop",
+    "downgrade",
+    "weak",
+    "decline",
+    "loss",
+    "bear",
+    "bearish",
+    "lawsuit",
+    "probe",
+    "investigation",
+    "cut guidance",
+    "cuts guidance",
+)
+
+
+def _keyword_hits(keywords: tuple[str, ...], text_lower: str) -> int:
+    """Count keywords occurring anywhere in the text (plain substring test, as before)."""
+    # map() keeps the per-keyword `in` check in C; sum() counts the True results
+    return sum(map(text_lower.__contains__, keywords))
+
+
+def _heuristic_sentiment_lc(text_lower: str) -> tuple[float, str]:
+    """Lightweight, deterministic sentiment proxy in [-1, 1] over pre-lowercased text."""
+    score = _keyword_hits(_POSITIVE_KEYWORDS, text_lower) - _keyword_hits(_NEGATIVE_KEYWORDS, text_lower)
 
     # Normalize to a small range and clamp.
     score_f = max(-1.0, min(1.0, score / 5.0))
@@ -107,7 +181,30 @@ def _heuristic_sentiment(title: str, summary: str) -> tuple[float, str]:
     return score_f, label
 
 
-@cache_data(ttl_seconds=0)  # Persistent cache (never expire) for reproducibility
+def _normalize_finnhub_item(item: dict, _from_ts=datetime.fromtimestamp, _utc=timezone.utc) -> dict:
+    """Map a raw Finnhub item onto the AlphaVantage-like article schema."""
+    headline = item.get("headline", "") or ""
+    summary = item.get("summary", "") or ""
+    # Scored once and reused for both the overall and ticker fields.
+    score, label = _heuristic_sentiment_lc(f"{headline} {summary}".lower())
+    ts = item.get("datetime")
+    published_iso = _from_ts(ts, _utc).isoformat() if isinstance(ts, int) and ts > 0 else ""
+
+    # Keep the AlphaVantage-like field names to avoid downstream churn.
+    return {
+        "title": headline,
+        "summary": summary,
+        "url": item.get("url", "") or "",
+        "source": item.get("source", "Unknown") or "Unknown",
+        "published": published_iso,
+        "overall_sentiment_score": float(score),
+        "overall_sentiment_label": label,
+        "ticker_sentiment_score": float(score),
+        "ticker_sentiment_label": label,
+        "relevance_score": 0.0,
+    }
+
+
 def search_news_finnhub(ticker: str, limit: int = 50, as_of: str | None = None, lookback_days: int = 7):
     """Fetch company news from Finnhub with a strict (from,to] window ending at as_of.
 
@@ -115,24 +212,24 @@ def search_news_finnhub(ticker: str, limit: int = 50, as_of: str | None = None,
     Finnhub free tier does not provide sentiment scores, so we add a small
     deterministic heuristic sentiment proxy to preserve downstream behavior.
     """
-    print(f"Searching Finnhub news for {ticker}...")
-
-    api_key = _get_finnhub_api_key()
-    if not api_key:
-        print("Warning: FINNHUB_API_KEY/FINHUB_API_KEY not found in .env")
+    # Checked before the never-expiring cache, so a run without a key doesn't
+    # pin empty results that a key set later would never replace
+    if not _get_finnhub_api_key():
+        logger.warning("FINNHUB_API_KEY/FINHUB_API_KEY not found in .env")
+        return []
+    if limit <= 0:
         return []
+    return _search_news_finnhub_cached(ticker, limit, as_of, lookback_days)
 
-    if as_of:
-        try:
-            end_dt = datetime.fromisoformat(as_of)
-        except ValueError:
-            end_dt = datetime.fromisoformat(as_of.split("T")[0])
-    else:
-        end_dt = datetime.now(timezone.utc)
+
+@cache_data(ttl_seconds=0)  # Persistent cache (never expire) for reproducibility
+def _search_news_finnhub_cached(ticker: str, limit: int, as_of: str | None, lookback_days: int):
+    logger.debug("Searching Finnhub news for %s", ticker)
+    api_key = _get_finnhub_api_key()
 
     # Finnhub expects YYYY-MM-DD; clamp to date boundaries.
-    end_date = end_dt.date()
-    start_date = (end_dt - timedelta(days=lookback_days)).date()
+    end_date = parse_iso_date(as_of) if as_of else datetime.now(timezone.utc).date()
+    start_date = end_date - timedelta(days=lookback_days)
     if start_date > end_date:
         start_date, end_date = end_date, start_date
 
@@ -144,58 +241,24 @@ def search_news_finnhub(ticker: str, limit: int = 50, as_of: str | None = None,
         "token": api_key,
     }
 
-    last_error: Exception | None = None
-    for attempt in range(3):
-        try:
-            response = requests.get(url, params=params, timeout=15)
-            if response.status_code == 429:
-                time.sleep(1.5 * (attempt + 1))
-                continue
-            response.raise_for_status()
-            data = response.json()
-            if not isinstance(data, list):
-                print(f"Unexpected Finnhub response shape: {data}")
-                return []
-
-            # Sort newest-first using Finnhub's unix seconds.
-            data_sorted = sorted(data, key=lambda x: x.get("datetime", 0), reverse=True)
-            articles: list[dict] = []
-            for item in data_sorted[: max(0, limit)]:
-                headline = item.get("headline", "") or ""
-                summary = item.get("summary", "") or ""
-                score, label = _heuristic_sentiment(headline, summary)
-                published_iso = ""
-                try:
-                    ts = int(item.get("datetime", 0) or 0)
-                    if ts > 0:
-                        published_iso = datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
-                except Exception:
-                    published_iso = ""
-
-                # Keep the AlphaVantage-like field names to avoid downstream churn.
-                article = {
-                    "title": headline,
-                    "summary": summary,
-                    "url": item.get("url", "") or "",
-                    "source": item.get("source", "Unknown") or "Unknown",
-                    "published": published_iso,
-                    "overall_sentiment_score": float(score),
-                    "overall_sentiment_label": label,
-                    "ticker_sentiment_score": float(score),
-                    "ticker_sentiment_label": label,
-                    "relevance_score": 0.0,
-                }
-                articles.append(article)
-
-            print(f"Found {len(articles)} articles for {ticker}")
-            return articles
-
-        except Exception as e:
-            last_error = e
-            time.sleep(0.5 * (attempt + 1))
-
-    print(f"Error fetching Finnhub news: {last_error}")
-    return []
+    try:
+        response = _SESSION.get(url, params=params, timeout=15)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+    except Exception as e:
+        logger.warning("Error fetching Finnhub news: %s", e)
+        return []
+
+    if not isinstance(data, list):
+        logger.warning("Unexpected Finnhub response shape: %.200r", data)
+        return []
+
+    # Newest-first by Finnhub's unix seconds; nlargest avoids sorting the whole response.
+    newest = heapq.nlargest(limit, data, key=lambda x: x.get("datetime", 0))
+    articles = [_normalize_finnhub_item(item) for item in newest]
+
+    logger.debug("Found %d articles for %s", len(articles), ticker)
+    return articles
 
 
 def search_news(query: str, limit: int = 5, as_of: str | None = None, lookback_days: int = 7):
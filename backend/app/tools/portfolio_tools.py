@@ -1,12 +1,97 @@
 # In nexustrader/backend/app/tools/portfolio_tools.py
+import logging
 import yfinance as yf
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from functools import lru_cache
-from ..utils.cache import cache_data
+from ..utils.cache import cache_data, data_cache
+from .technical_analysis_tools import get_historical_price_data
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _ticker(symbol: str) -> yf.Ticker:
+    """One yf.Ticker per symbol, so repeated history calls reuse its session state."""
+    return yf.Ticker(symbol)
+
+
+def _history_window(as_of: str = None) -> dict:
+    """yfinance start/end kwargs for the 1Y window ending on as_of (period='1y' when live)."""
+    if not as_of:
+        return {"period": "1y"}
+    try:
+        end_date = datetime.fromisoformat(as_of)
+    except ValueError:
+        end_date = datetime.fromisoformat(as_of.split("T")[0])
+    return {"start": end_date - timedelta(days=365), "end": end_date + timedelta(days=1)}
+
+
+@cache_data(ttl_seconds=1800)
+def _one_year_history(symbol: str, as_of: str = None) -> pd.DataFrame:
+    """1Y daily history for symbol ending on as_of. Always call positionally so prefetch keys match."""
+    return _ticker(symbol).history(**_history_window(as_of))
+
+
+def _prefetch_keys(ticker: str, symbol: str, as_of: str = None) -> list:
+    """data_cache keys that prefetch_market_data seeds for symbol."""
+    keys = [data_cache._generate_key(_one_year_history.__name__, (symbol, as_of), {})]
+    if symbol == ticker:
+        keys.append(data_cache._generate_key(get_historical_price_data.__name__, (ticker, "1y"), {"as_of": as_of}))
+    return keys
+
+
+def prefetch_market_data(ticker: str, as_of: str = None) -> None:
+    """
+    Fetch the 1Y history for ticker and ^VIX in one batched yf.download call.
+
+    Seeds data_cache under the keys used by get_historical_price_data(ticker, "1y", as_of=...)
+    and _one_year_history (which backs calculate_ticker_risk_metrics and
+    get_market_volatility_index), so one analysis costs a single round trip
+    instead of one per tool. Symbols whose keys are already cached (in memory
+    or on disk) are skipped, so a warm run makes no request at all.
+    Best-effort: on failure the tools fetch on their own.
+    """
+    keys = {symbol: _prefetch_keys(ticker, symbol, as_of) for symbol in (ticker, "^VIX")}
+    symbols = [
+        symbol for symbol, symbol_keys in keys.items()
+        if any(data_cache.get(key) is None for key in symbol_keys)
+    ]
+    if not symbols:
+        logger.debug("Prefetch skipped, %s and ^VIX already cached (as_of=%s)", ticker, as_of)
+        return
+
+    try:
+        frames = yf.download(
+            symbols,
+            group_by="ticker",
+            actions=True,
+            progress=False,
+            threads=True,
+            **_history_window(as_of),
+        )
+    except Exception as e:
+        logger.warning("Batched prefetch failed for %s: %s", symbols, e)
+        return
+    if frames is None or frames.empty:
+        return
+
+    # yf.download upper-cases symbols in the column level; keys keep the caller's spelling.
+    # Older yfinance returns flat columns when only one symbol is requested.
+    multi = isinstance(frames.columns, pd.MultiIndex)
+    fetched = set(frames.columns.get_level_values(0)) if multi else {symbols[0].upper()}
+    for symbol in symbols:
+        column = symbol.upper()
+        if column not in fetched:
+            continue
+        hist = (frames[column] if multi else frames).dropna(how="all")
+        if hist.empty:
+            continue
+        for key in keys[symbol]:
+            data_cache.set(key, hist)
+    logger.debug("Prefetched %s (as_of=%s)", symbols, as_of)
 
-@cache_data(ttl_seconds=86400)
 def get_market_volatility_index(as_of: str = None):
     """
     Returns VIX value.
@@ -15,24 +100,42 @@ def get_market_volatility_index(as_of: str = None):
       Fixes the data leakage bug where all historical runs used today's VIX.
     - as_of = None (live UI): fetches latest VIX for real-time analysis.
     """
-    print(f"[VIX] Fetching VIX (as_of={as_of})...")
-    try:
-        vix = yf.Ticker("^VIX")
-        if as_of:
-            as_of_dt = datetime.fromisoformat(as_of)
-            start_date = as_of_dt - timedelta(days=7)  # buffer for weekends/holidays
-            hist = vix.history(start=start_date, end=as_of_dt + timedelta(days=1))
+    logger.debug("[VIX] Fetching VIX (as_of=%s)", as_of)
+    if as_of:
+        try:
+            # Shares the 1Y ^VIX window seeded by prefetch_market_data (already
+            # cached); the last bar is the close on or before as_of.
+            hist = _one_year_history("^VIX", as_of)
             if not hist.empty:
                 close_price = float(hist['Close'].iloc[-1])
                 return f"{close_price:.2f}"
-        # Live fallback (as_of = None or no data found for historical date)
+        except Exception as e:
+            logger.warning("Error fetching VIX: %s", e)
+            return "20.00 (Default - Error)"
+    # Live fallback (as_of = None or no data found for historical date)
+    return _live_vix()
+
+
+@cache_data(ttl_seconds=300)  # Live quote: refresh every 5 minutes
+def _live_vix() -> str:
+    """Latest VIX level as a 2-decimal string (or a labelled default)."""
+    try:
+        # fast_info's last_price is one small quote request; history() is the backup.
+        # Fresh object on purpose: fast_info memoizes last_price on the instance.
+        vix = yf.Ticker("^VIX")
+        try:
+            last_price = float(vix.fast_info["last_price"])
+            if last_price > 0:
+                return f"{last_price:.2f}"
+        except Exception as e:
+            logger.debug("[VIX] fast_info unavailable, using history: %s", e)
         hist = vix.history(period="1d")
         if not hist.empty:
             close_price = float(hist['Close'].iloc[-1])
             return f"{close_price:.2f}"
         return "20.00 (Default - Data Unavailable)"
     except Exception as e:
-        print(f"Error fetching VIX: {e}")
+        logger.warning("Error fetching VIX: %s", e)
         return "20.00 (Default - Error)"
 
 def get_portfolio_composition():
@@ -43,6 +146,21 @@ def get_portfolio_composition():
     """
     return "100% Cash (Simulated for Single Ticker Evaluation)"
 
+def _risk_kernel(close: np.ndarray) -> tuple[float, float, float]:
+    """
+    Annualized volatility %, max drawdown % and last close from a Close array.
+
+    Works on a plain float64 array so it can be reused for batch/multi-ticker
+    sweeps without going through pandas. NaN bars are skipped like pandas'
+    skipna reductions (fmax ignores NaN when tracking the running peak).
+    """
+    returns = np.diff(close) / close[:-1]
+    volatility = float(np.nanstd(returns, ddof=1)) * np.sqrt(252) * 100
+    running_max = np.fmax.accumulate(close)
+    max_drawdown = float(np.nanmin((close - running_max) / running_max)) * 100
+    return volatility, max_drawdown, float(close[-1])
+
+
 @cache_data(ttl_seconds=1800)
 def calculate_ticker_risk_metrics(ticker: str, as_of: str = None):
     """
@@ -51,37 +169,19 @@ def calculate_ticker_risk_metrics(ticker: str, as_of: str = None):
     - Max Drawdown (1Y)
     - Beta (vs S&P 500)
     """
-    print(f"Calculating risk metrics for {ticker}...")
+    logger.debug("Calculating risk metrics for %s", ticker)
     try:
-        stock = yf.Ticker(ticker)
-        if as_of:
-            try:
-                end_date = datetime.fromisoformat(as_of)
-            except ValueError:
-                end_date = datetime.fromisoformat(as_of.split("T")[0])
-
-            start_date = end_date - timedelta(days=365)
-            hist = stock.history(start=start_date, end=end_date + timedelta(days=1))
-        else:
-            hist = stock.history(period="1y")
+        hist = _one_year_history(ticker, as_of)
         
         if hist.empty:
             return {"error": "No historical data found"}
             
-        # 1. Volatility (Annualized Standard Deviation of Returns)
-        hist['Returns'] = hist['Close'].pct_change()
-        volatility = hist['Returns'].std() * np.sqrt(252) * 100
-        
-        # 2. Max Drawdown
-        rolling_max = hist['Close'].cummax()
-        drawdown = (hist['Close'] - rolling_max) / rolling_max
-        max_drawdown = drawdown.min() * 100
+        # 1. Volatility (annualized), 2. Max Drawdown, current price
+        volatility, max_drawdown, current_price = _risk_kernel(hist['Close'].to_numpy(dtype=np.float64))
         
         # 3. Beta (proxy vs SPY if possible, simplified here just to volatility)
         # To compute real Beta we need SPY data. Let's stick to Volatility & Drawdown for speed.
         
-        current_price = hist['Close'].iloc[-1]
-        
         return {
             "annualized_volatility_pct": f"{volatility:.2f}%",
             "max_drawdown_1y_pct": f"{max_drawdown:.2f}%",
@@ -89,7 +189,7 @@ def calculate_ticker_risk_metrics(ticker: str, as_of: str = None):
             "risk_rating": "HIGH" if volatility > 40 else "MODERATE" if volatility > 20 else "LOW"
         }
     except Exception as e:
-        print(f"Error calculating risk: {e}")
+        logger.warning("Error calculating risk: %s", e)
         return {"error": str(e)}
 
 def calculate_portfolio_VaR(portfolio):
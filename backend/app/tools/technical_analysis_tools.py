@@ -1,57 +1,97 @@
 # In nexustrader/backend/app/tools/technical_analysis_tools.py
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for web server
-
 import yfinance as yf
+import numpy as np
 import pandas as pd
-import mplfinance as mpf
+import logging
 import os
+import warnings
 from datetime import datetime, timedelta
+from functools import lru_cache
 from ..utils.cache import cache_data
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _ticker(symbol: str) -> yf.Ticker:
+    """One yf.Ticker per symbol, so repeated history calls reuse its session state."""
+    return yf.Ticker(symbol)
+
 
-def _add_rsi(df: pd.DataFrame, length: int = 14) -> None:
-    delta = df["Close"].diff()
+def _rsi(close: pd.Series, length: int = 14) -> dict[str, pd.Series]:
+    delta = close.diff()
     gain = delta.clip(lower=0)
     loss = -delta.clip(upper=0)
     avg_gain = gain.ewm(alpha=1 / length, min_periods=length, adjust=False).mean()
     avg_loss = loss.ewm(alpha=1 / length, min_periods=length, adjust=False).mean()
     rs = avg_gain / avg_loss.replace(0, pd.NA)
-    df[f"RSI_{length}"] = 100 - (100 / (1 + rs))
+    return {f"RSI_{length}": 100 - (100 / (1 + rs))}
 
 
-def _add_sma(df: pd.DataFrame, length: int) -> None:
-    df[f"SMA_{length}"] = df["Close"].rolling(window=length).mean()
+def _rolling_mean(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Trailing mean over `length` bars via a cumulative sum (one C pass).
+
+    Matches Series.rolling(length).mean(): NaN until `length` bars are
+    available and for any window that contains a NaN.
+    """
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    count = np.concatenate(([0], np.cumsum(valid)))
+    out = np.full(values.shape, np.nan)
+    if len(values) >= length:
+        sums = csum[length:] - csum[:-length]
+        full = (count[length:] - count[:-length]) == length
+        out[length - 1:] = np.where(full, sums / length, np.nan)
+    return out
 
 
-def _add_macd(df: pd.DataFrame) -> None:
-    ema_fast = df["Close"].ewm(span=12, adjust=False).mean()
-    ema_slow = df["Close"].ewm(span=26, adjust=False).mean()
+def _sma(close: pd.Series, length: int) -> dict[str, pd.Series]:
+    values = close.to_numpy(dtype=np.float64)
+    return {f"SMA_{length}": pd.Series(_rolling_mean(values, length), index=close.index)}
+
+
+def _macd(close: pd.Series) -> dict[str, pd.Series]:
+    ema_fast = close.ewm(span=12, adjust=False).mean()
+    ema_slow = close.ewm(span=26, adjust=False).mean()
     macd = ema_fast - ema_slow
     signal = macd.ewm(span=9, adjust=False).mean()
     hist = macd - signal
-    df["MACD_12_26_9"] = macd
-    df["MACDs_12_26_9"] = signal
-    df["MACDh_12_26_9"] = hist
-
-
-def _add_bollinger_bands(df: pd.DataFrame, length: int = 20, std_dev: float = 2.0) -> None:
-    rolling_mean = df["Close"].rolling(window=length).mean()
-    rolling_std = df["Close"].rolling(window=length).std()
-    df[f"BBL_{length}_{std_dev}"] = rolling_mean - std_dev * rolling_std
-    df[f"BBM_{length}_{std_dev}"] = rolling_mean
-    df[f"BBU_{length}_{std_dev}"] = rolling_mean + std_dev * rolling_std
-    band_width = df[f"BBU_{length}_{std_dev}"] - df[f"BBL_{length}_{std_dev}"]
-    df[f"BBB_{length}_{std_dev}"] = band_width / rolling_mean.replace(0, pd.NA)
-    df[f"BBP_{length}_{std_dev}"] = (df["Close"] - df[f"BBL_{length}_{std_dev}"]) / band_width.replace(0, pd.NA)
+    return {
+        "MACD_12_26_9": macd,
+        "MACDs_12_26_9": signal,
+        "MACDh_12_26_9": hist,
+    }
+
+
+def _bollinger_bands(
+    close: pd.Series,
+    length: int = 20,
+    std_dev: float = 2.0,
+    rolling_mean: pd.Series | None = None,
+) -> dict[str, pd.Series]:
+    window = close.rolling(window=length)
+    if rolling_mean is None:
+        rolling_mean = window.mean()
+    rolling_std = window.std()
+    lower = rolling_mean - std_dev * rolling_std
+    upper = rolling_mean + std_dev * rolling_std
+    band_width = upper - lower
+    return {
+        f"BBL_{length}_{std_dev}": lower,
+        f"BBM_{length}_{std_dev}": rolling_mean,
+        f"BBU_{length}_{std_dev}": upper,
+        f"BBB_{length}_{std_dev}": band_width / rolling_mean.replace(0, pd.NA),
+        f"BBP_{length}_{std_dev}": (close - lower) / band_width.replace(0, pd.NA),
+    }
 
 @cache_data(ttl_seconds=3600)  # Cache for 1 hour
 def get_historical_price_data(ticker: str, period: str = "1y", as_of: str = None):
     """
     Returns the historical price and volume data for the stock.
     """
-    print(f"Fetching historical price data for {ticker}...")
-    stock = yf.Ticker(ticker)
+    logger.debug("Fetching historical price data for %s", ticker)
+    stock = _ticker(ticker)
     if as_of:
         try:
             end_date = datetime.fromisoformat(as_of)
@@ -59,80 +99,135 @@ def get_historical_price_data(ticker: str, period: str = "1y", as_of: str = None
             end_date = datetime.fromisoformat(as_of.split("T")[0])
 
         start_date = end_date - timedelta(days=365)
+        # Backtest replays ask for many as_of dates per ticker; slice them all
+        # out of one cached max-history download instead of a request per date.
+        full = _get_full_history(ticker)
+        if not full.empty and full.index[-1].date() >= end_date.date():
+            return full.loc[start_date.strftime("%Y-%m-%d"):end_date.strftime("%Y-%m-%d")]
         hist = stock.history(start=start_date, end=end_date + timedelta(days=1))
     else:
         hist = stock.history(period=period)
     return hist
 
+
+@cache_data(ttl_seconds=86400)
+def _get_full_history(ticker: str) -> pd.DataFrame:
+    """Entire daily history for ticker (period='max'), sliced by get_historical_price_data."""
+    try:
+        return _ticker(ticker).history(period="max")
+    except Exception as e:
+        logger.warning("Full history fetch failed for %s: %s", ticker, e)
+        return pd.DataFrame()
+
 def calculate_technical_indicators(price_data):
     """
     Calculates a comprehensive set of technical indicators from the price data.
     Includes RSI, SMA, MACD, Bollinger Bands, and volume analysis.
     """
-    print("Calculating technical indicators...")
+    logger.debug("Calculating technical indicators")
     if price_data.empty:
         return {}
 
-    df = price_data.copy()
+    # Indicators are computed straight off Close and keyed by name, so the
+    # (possibly cached) input frame is never copied or extended with columns.
+    close = price_data['Close']
+    indicators: dict[str, pd.Series] = {}
 
     # RSI (14-period)
-    _add_rsi(df, length=14)
+    indicators.update(_rsi(close, length=14))
 
     # Moving Averages
-    _add_sma(df, length=20)
-    _add_sma(df, length=50)
+    indicators.update(_sma(close, length=20))
+    indicators.update(_sma(close, length=50))
 
     # MACD (12, 26, 9)
-    _add_macd(df)
+    indicators.update(_macd(close))
 
     # Bollinger Bands (20-period, 2 std dev)
-    _add_bollinger_bands(df, length=20, std_dev=2.0)
-
-    # --- Collect latest values for all indicator columns ---
-    latest = df.iloc[-1]
-    indicator_tags = ['RSI', 'SMA', 'MACD', 'BBL', 'BBM', 'BBU', 'BBB', 'BBP']
-    indicator_cols = [col for col in df.columns
-                      if any(tag in col for tag in indicator_tags)]
+    # The middle band is the SMA_20 already computed above.
+    indicators.update(_bollinger_bands(close, length=20, std_dev=2.0, rolling_mean=indicators["SMA_20"]))
 
+    # --- Collect latest values for all indicators ---
     result = {}
-    for col in indicator_cols:
-        val = latest[col]
+    for col, series in indicators.items():
+        val = series.iloc[-1]
         if pd.notna(val):
             result[col] = round(float(val), 4)
 
     # --- Volume analysis ---
-    if 'Volume' in df.columns and len(df) >= 20:
-        vol_sma_20 = df['Volume'].rolling(window=20).mean().iloc[-1]
-        latest_vol = float(df['Volume'].iloc[-1])
+    if 'Volume' in price_data.columns and len(price_data) >= 20:
+        vol_sma_20 = price_data['Volume'].rolling(window=20).mean().iloc[-1]
+        latest_vol = float(price_data['Volume'].iloc[-1])
         if pd.notna(vol_sma_20) and vol_sma_20 > 0:
             result['Volume_SMA_20'] = round(float(vol_sma_20), 0)
             result['Volume_Ratio'] = round(latest_vol / float(vol_sma_20), 2)
 
     # --- Price context (5-day trend) ---
-    if len(df) >= 5:
-        last5_close = df['Close'].iloc[-5:]
+    if len(price_data) >= 5:
+        last5_close = close.iloc[-5:]
         result['price_trend_5d_pct'] = round(
             float((last5_close.iloc[-1] / last5_close.iloc[0] - 1) * 100), 2
         )
-        result['current_price'] = round(float(df['Close'].iloc[-1]), 2)
+        result['current_price'] = round(float(close.iloc[-1]), 2)
 
     return result
 
+CHART_DIR = "charts"
+CHART_DIR_MAX_BYTES = int(os.getenv("NEXUSTRADER_CHART_DIR_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def _prune_chart_dir(output_dir: str, max_bytes: int = CHART_DIR_MAX_BYTES) -> None:
+    """Delete least-recently-used PNGs until the chart directory fits max_bytes."""
+    try:
+        entries = [e for e in os.scandir(output_dir) if e.is_file() and e.name.endswith(".png")]
+        stats = sorted(((e.stat(), e.path) for e in entries), key=lambda item: item[0].st_mtime)
+        total = sum(st.st_size for st, _ in stats)
+        for st, path in stats:
+            if total <= max_bytes:
+                break
+            os.remove(path)
+            total -= st.st_size
+    except OSError as e:
+        logger.warning("Chart directory prune failed: %s", e)
+
+
 def plot_stock_chart(price_data, ticker: str):
     """
     Generates a stock chart with the price data and technical indicators.
+
+    Deprecated: the frontend draws candles itself from get_chart_data_json
+    (/api/chart), so nothing in the app rasterizes charts any more. Kept for
+    scripts; needs the optional `charts` extra (mplfinance). Rendered PNGs
+    are reused for the same ticker and bar range.
     """
-    print("Plotting stock chart...")
+    warnings.warn(
+        "plot_stock_chart is deprecated; use get_chart_data_json and render client-side",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     if price_data.empty:
         return None
 
     # Ensure the output directory exists
-    output_dir = "charts"
+    output_dir = CHART_DIR
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
+
+    first_bar = price_data.index[0].date().isoformat()
+    last_bar = price_data.index[-1].date().isoformat()
+    chart_file = os.path.join(output_dir, f"{ticker}_{first_bar}_{last_bar}_chart.png")
+    if os.path.exists(chart_file):
+        os.utime(chart_file)  # mark as recently used for pruning
+        logger.debug("Reusing rendered chart %s", chart_file)
+        return chart_file
+
+    # matplotlib/mplfinance are only imported when a PNG actually has to be drawn.
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for web server
+    import mplfinance as mpf
+
+    logger.debug("Plotting stock chart for %s", ticker)
     # Create the plot with moving averages
-    chart_file = os.path.join(output_dir, f"{ticker}_chart.png")
     mpf.plot(
         price_data,
         type='candle',
@@ -143,7 +238,8 @@ def plot_stock_chart(price_data, ticker: str):
         volume=True,
         savefig=chart_file
     )
-    
+    _prune_chart_dir(output_dir)
+
     return chart_file
 
 @cache_data(ttl_seconds=3600)
@@ -151,8 +247,8 @@ def get_chart_data_json(ticker: str, period: str = "6mo", as_of: str = None):
     """
     Returns OHLCV data formatted for lightweight charting libraries.
     """
-    print(f"Fetching chart data for {ticker}...")
-    stock = yf.Ticker(ticker)
+    logger.debug("Fetching chart data for %s", ticker)
+    stock = _ticker(ticker)
 
     if as_of:
         try:
@@ -180,22 +276,16 @@ def get_chart_data_json(ticker: str, period: str = "6mo", as_of: str = None):
     if hist.empty:
         return []
 
-    # Ensure we have the required columns
-    hist = hist[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-
-    # Reset index to access dates
-    hist.reset_index(inplace=True)
-
     # Format for Lightweight Charts: time (YYYY-MM-DD), open, high, low, close, volume
-    chart_data = []
-    for _, row in hist.iterrows():
-        chart_data.append({
-            "time": row['Date'].strftime('%Y-%m-%d'),
-            "open": round(float(row['Open']), 4),
-            "high": round(float(row['High']), 4),
-            "low": round(float(row['Low']), 4),
-            "close": round(float(row['Close']), 4),
-            "volume": int(row['Volume']),
-        })
+    # Columns are read straight off the history frame (dates from its index),
+    # so no intermediate OHLCV copy is built; only the final dicts are per row.
+    times = hist.index.strftime('%Y-%m-%d').tolist()
+    ohlc = np.round(hist[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64), 4).tolist()
+    volumes = hist['Volume'].to_numpy(dtype=np.int64).tolist()
+
+    chart_data = [
+        {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, (o, h, l, c), v in zip(times, ohlc, volumes)
+    ]
 
     return chart_data
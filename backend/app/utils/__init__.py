@@ -7,7 +7,6 @@ Utility modules for NexusTrader backend.
 from .cache import cache_data, cache_llm, clear_all_caches, data_cache, llm_cache
 from .shared_context import (
     SharedDataContext,
-    shared_context,
     initialize_context,
     get_shared_context,
 )
@@ -19,7 +18,6 @@ __all__ = [
     "data_cache",
     "llm_cache",
     "SharedDataContext",
-    "shared_context",
     "initialize_context",
     "get_shared_context",
 ]
@@ -5,66 +5,250 @@ Simple caching mechanism to avoid redundant API calls and LLM requests.
 This significantly reduces execution time and API costs.
 """
 
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import wraps
-from typing import Any, Callable
-import hashlib
-import json
+from typing import Any, Callable, Hashable
+import logging
+import os
+import pickle
+import sqlite3
+import threading
 import time
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+_ARRAY_TYPES = (pd.DataFrame, pd.Series, np.ndarray)
+
+
+def _detach(value: Any) -> Any:
+    """
+    Hand out DataFrames as shallow copies so callers can't add columns to the cached frame.
+
+    copy(deep=False) shares the underlying blocks (no data is copied) but gets
+    its own column index, so e.g. df["RSI"] = ... on the result leaves the
+    cached entry untouched. Other values are returned as-is.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    return value
+
 class SimpleCache:
     """
-    In-memory cache with optional disk persistence.
+    In-memory LRU cache with optional disk persistence.
     """
     
-    def __init__(self, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        persist_path: str | Path | None = None,
+        maxsize: int | None = None,
+    ):
         """
         Initialize cache with time-to-live.
         
         Args:
             ttl_seconds: How long cached data remains valid (default: 1 hour)
+            persist_path: Optional SQLite file; entries are written through to it
+                and read back on in-memory misses, so they survive restarts.
+            maxsize: Max in-memory entries; least recently used are evicted first
+                (None = unbounded). Evicted entries stay on disk when persisted.
+                Entries stored with ttl 0 (never expire) don't count and are
+                never evicted.
         """
-        self.cache = {}
+        self.cache: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        # Never-expiring entries (ttl 0) live outside the LRU, so churn from
+        # short-lived entries can't evict them
+        self.pinned: dict[Hashable, tuple[Any, float]] = {}
         self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # Per-key population locks for single-flight misses
+        self._locks: dict[Hashable, threading.Lock] = {}
+        self._meta_lock = threading.Lock()
+        self.persist_path = str(persist_path) if persist_path else None
+        self._disk_lock = threading.Lock()
+        if self.persist_path:
+            self._initialize_disk()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.persist_path, check_same_thread=False)
+    
+    def _initialize_disk(self) -> None:
+        parent = os.path.dirname(os.path.abspath(self.persist_path))
+        os.makedirs(parent, exist_ok=True)
+        with self._disk_lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)"
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    
+    def _disk_get(self, key: Hashable) -> tuple[Any, float] | None:
+        try:
+            with self._disk_lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        "SELECT value, stored_at FROM cache_entries WHERE key = ?", (repr(key),)
+                    ).fetchone()
+                finally:
+                    conn.close()
+            if row is None:
+                return None
+            return pickle.loads(row[0]), row[1]
+        except Exception as e:
+            logger.warning("Disk cache read failed for %r: %s", key, e)
+            return None
     
-    def _generate_key(self, func_name: str, args: tuple, kwargs: dict) -> str:
-        """Generate a unique cache key from function name and arguments."""
-        key_data = {
-            'func': func_name,
-            'args': str(args),
-            'kwargs': str(sorted(kwargs.items()))
-        }
-        key_str = json.dumps(key_data, sort_keys=True)
-        return hashlib.md5(key_str.encode()).hexdigest()
+    def _disk_set(self, key: Hashable, value: Any, stored_at: float) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._disk_lock:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (key, value, stored_at) VALUES (?, ?, ?)",
+                        (repr(key), blob, stored_at),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            logger.warning("Disk cache write failed for %r: %s", key, e)
+    
+    def _generate_key(self, func_name: str, args: tuple, kwargs: dict) -> Hashable | None:
+        """
+        Generate a unique cache key from function name and arguments.
+
+        Returns None (don't cache) when an argument is array data: its repr is
+        both huge and truncated, so distinct frames could share a key.
+        """
+        if any(isinstance(a, _ARRAY_TYPES) for a in (*args, *kwargs.values())):
+            return None
+        key = (func_name, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable argument (list, dict, ...) - fall back to its repr
+            key = (func_name, repr(args), repr(sorted(kwargs.items())))
+        return key
     
-    def get(self, key: str) -> Any:
-        """Retrieve cached value if not expired. ttl_seconds=0 means never expire."""
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            if self.ttl_seconds == 0 or time.time() - timestamp < self.ttl_seconds:
-                return value
+    def _remember(self, key: Hashable, entry: tuple[Any, float], pinned: bool = False) -> None:
+        """Insert entry as most recently used and evict down to maxsize."""
+        with self._lock:
+            if pinned:
+                self.pinned[key] = entry
+                self.cache.pop(key, None)
+                return
+            self.cache[key] = entry
+            self.cache.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self.cache) > self.maxsize:
+                    self.cache.popitem(last=False)
+    
+    def get(self, key: Hashable, ttl_seconds: int | None = None) -> Any:
+        """
+        Retrieve cached value if not expired. ttl_seconds=0 means never expire.
+
+        ttl_seconds overrides the cache-wide TTL for this lookup, so entries
+        written by different cache_data functions can each keep their own.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            entry = self.pinned.get(key)
+            if entry is None:
+                entry = self.cache.get(key)
+                if entry is not None:
+                    self.cache.move_to_end(key)
+        if entry is None and self.persist_path:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._remember(key, entry, pinned=ttl == 0)
+        if entry is not None:
+            value, timestamp = entry
+            if ttl == 0 or time.time() - timestamp < ttl:
+                return _detach(value)
             else:
-                # Expired, remove from cache
-                del self.cache[key]
+                # Expired, remove from cache (another thread may have beaten us to it)
+                with self._lock:
+                    self.cache.pop(key, None)
+                    self.pinned.pop(key, None)
         return None
     
-    def set(self, key: str, value: Any):
-        """Store value in cache with current timestamp."""
-        self.cache[key] = (value, time.time())
+    def set(self, key: Hashable, value: Any, ttl_seconds: int | None = None):
+        """
+        Store value in cache with current timestamp.
+
+        ttl_seconds is the TTL the entry will be read back with (as in get);
+        0 keeps it out of LRU eviction.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        stored_at = time.time()
+        self._remember(key, (value, stored_at), pinned=ttl == 0)
+        if self.persist_path:
+            self._disk_set(key, value, stored_at)
+    
+    @contextmanager
+    def single_flight(self, key: Hashable):
+        """
+        Serialize population of one key so concurrent misses compute it once.
+
+        Callers re-check the cache after entering; other keys are not blocked.
+        """
+        with self._meta_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                yield
+            finally:
+                with self._meta_lock:
+                    if self._locks.get(key) is lock:
+                        del self._locks[key]
     
     def clear(self):
         """Clear all cached data."""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self.pinned.clear()
+        if self.persist_path:
+            with self._disk_lock:
+                conn = self._connect()
+                try:
+                    conn.execute("DELETE FROM cache_entries")
+                    conn.commit()
+                finally:
+                    conn.close()
 
 
 # Global cache instances
-data_cache = SimpleCache(ttl_seconds=3600)  # 1 hour for market data
-llm_cache = SimpleCache(ttl_seconds=86400)  # 24 hours for LLM responses
+# Market data persistence is opt-in: set NEXUSTRADER_DATA_CACHE_DB to a SQLite
+# path so a restart within the TTL doesn't re-hit yfinance. Entries are pickled,
+# so only point it at a file this process wrote itself. Relative paths are
+# anchored to the backend directory, not the current working directory.
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+DATA_CACHE_DB = os.getenv("NEXUSTRADER_DATA_CACHE_DB", "")
+if DATA_CACHE_DB and not os.path.isabs(DATA_CACHE_DB):
+    DATA_CACHE_DB = os.fspath(_BACKEND_DIR / DATA_CACHE_DB)
+data_cache = SimpleCache(ttl_seconds=3600, persist_path=DATA_CACHE_DB or None, maxsize=512)  # 1 hour for market data
+llm_cache = SimpleCache(ttl_seconds=86400, maxsize=2048)  # 24 hours for LLM responses
 
 
 def cache_data(ttl_seconds: int = 3600):
     """
     Decorator to cache function results for market data.
+
+    Results live in data_cache; ttl_seconds is checked on every lookup, so it
+    applies per function rather than data_cache's default.
     
     Usage:
         @cache_data(ttl_seconds=3600)
@@ -76,21 +260,30 @@ def cache_data(ttl_seconds: int = 3600):
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache_key = data_cache._generate_key(func.__name__, args, kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
             
             # Try to get from cache
-            cached_result = data_cache.get(cache_key)
+            cached_result = data_cache.get(cache_key, ttl_seconds)
             if cached_result is not None:
-                print(f"[CACHE HIT] {func.__name__} - Using cached data")
+                logger.debug("[CACHE HIT] %s - Using cached data", func.__name__)
                 return cached_result
             
-            # Cache miss - call function
-            print(f"[CACHE MISS] {func.__name__} - Fetching fresh data")
-            result = func(*args, **kwargs)
+            with data_cache.single_flight(cache_key):
+                # Another thread may have populated the key while we waited
+                cached_result = data_cache.get(cache_key, ttl_seconds)
+                if cached_result is not None:
+                    logger.debug("[CACHE HIT] %s - Using cached data", func.__name__)
+                    return cached_result
+                
+                # Cache miss - call function
+                logger.debug("[CACHE MISS] %s - Fetching fresh data", func.__name__)
+                result = func(*args, **kwargs)
+                
+                # Store in cache
+                data_cache.set(cache_key, result, ttl_seconds)
             
-            # Store in cache
-            data_cache.set(cache_key, result)
-            
-            return result
+            return _detach(result)
         return wrapper
     return decorator
 
@@ -110,18 +303,26 @@ def cache_llm(ttl_seconds: int = 86400):
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache_key = llm_cache._generate_key(func.__name__, args, kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
             
             # Try to get from cache
             cached_result = llm_cache.get(cache_key)
             if cached_result is not None:
-                print(f"[LLM CACHE HIT] Using cached response")
+                logger.debug("[LLM CACHE HIT] Using cached response")
                 return cached_result
             
-            # Cache miss - call LLM
-            result = func(*args, **kwargs)
-            
-            # Store in cache
-            llm_cache.set(cache_key, result)
+            with llm_cache.single_flight(cache_key):
+                cached_result = llm_cache.get(cache_key)
+                if cached_result is not None:
+                    logger.debug("[LLM CACHE HIT] Using cached response")
+                    return cached_result
+                
+                # Cache miss - call LLM
+                result = func(*args, **kwargs)
+                
+                # Store in cache
+                llm_cache.set(cache_key, result)
             
             return result
         return wrapper
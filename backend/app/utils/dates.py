@@ -0,0 +1,20 @@
+# In nexustrader/backend/app/utils/dates.py
+
+"""
+Memoized ISO date parsing for as_of strings.
+Backtests pass the same few simulated dates to every tool call, so parse each once.
+"""
+
+from datetime import date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def parse_iso_date(value: str) -> date:
+    """
+    Parse 'YYYY-MM-DD' or a full ISO timestamp into a date.
+
+    Raises:
+        ValueError: if the leading date portion is not a valid ISO date
+    """
+    return date.fromisoformat(value[:10])
@@ -5,11 +5,232 @@ Financial Memory System for NexusTrader
 Stores past analyses and outcomes to enable agent learning.
 """
 
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Any, Optional
+import asyncio
+import atexit
+import hashlib
+import heapq
 import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+
+# Buffered store_analysis writes are flushed as one collection.add once this
+# many are pending, or FLUSH_DELAY_SECONDS after the first one arrives.
+BATCH_SIZE = 64
+FLUSH_DELAY_SECONDS = 0.5
+
+# Recent get_similar_past_analyses results kept per instance (cleared on writes)
+QUERY_MEMO_SIZE = 256
+
+# Must match Chroma's default embedding function so client- and Chroma-side
+# embeddings live in the same space
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Query strings whose embeddings are kept process-wide (shared by all instances)
+QUERY_EMBED_CACHE_SIZE = 256
+
+# Collection settings (HNSW params only take effect when a collection is created).
+# New collections use cosine space; ones created earlier keep Chroma's default
+# l2, and _distance_to_similarity maps both to the same cosine similarity.
+# batch_size/sync_threshold defer index persistence so buffered writes don't
+# pay a sync per add. The graph params come from hnsw_params_for.
+COLLECTION_METADATA = {
+    "description": "NexusTrader financial analysis memory",
+    "hnsw:space": "cosine",
+    "hnsw:batch_size": 100,
+    "hnsw:sync_threshold": 1000,
+}
+
+
+def hnsw_params_for(expected_size: int) -> Dict[str, int]:
+    """
+    HNSW graph parameters sized for a collection of about expected_size vectors.
+
+    Small collections keep the graph cheap to build; larger ones trade build
+    time and memory for recall at the same query latency.
+    """
+    if expected_size < 100_000:
+        return {"hnsw:M": 16, "hnsw:construction_ef": 64, "hnsw:search_ef": 40}
+    if expected_size < 1_000_000:
+        return {"hnsw:M": 24, "hnsw:construction_ef": 100, "hnsw:search_ef": 100}
+    return {"hnsw:M": 32, "hnsw:construction_ef": 128, "hnsw:search_ef": 200}
+
+# Process-wide handles keyed by absolute persist directory / (directory, collection);
+# the in-memory client is keyed by None
+_CLIENTS: Dict[Optional[str], Any] = {}
+_COLLECTIONS: Dict[tuple, Any] = {}
+
+
+class _CollectionState:
+    """
+    Write buffer and query memo for one collection, shared by every
+    FinancialMemory on it, so one instance's writes flush before (and
+    invalidate the memo of) another's reads.
+    """
+
+    def __init__(self):
+        # Buffered store_analysis records (see FinancialMemory.flush)
+        self.pending: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": []}
+        self.lock = threading.Lock()
+        # Serializes flushes so a read's flush waits for one already embedding
+        self.flush_lock = threading.Lock()
+        self.flush_timer: Optional[threading.Timer] = None
+        # Similarity-query memo; any write to the collection invalidates it
+        self.query_memo: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+
+
+# Keyed like _COLLECTIONS
+_COLLECTION_STATE: Dict[tuple, _CollectionState] = {}
+
+
+def _get_client(persist_directory: Optional[str]):
+    """Return the client for persist_directory (None = in-memory), creating it once."""
+    client = _CLIENTS.get(persist_directory)
+    if client is None:
+        # Imported here so modules that never touch memory don't pay chromadb's
+        # (and onnxruntime's) import cost
+        import chromadb
+        if persist_directory is None:
+            client = chromadb.EphemeralClient()
+        else:
+            client = chromadb.PersistentClient(path=persist_directory)
+        _CLIENTS[persist_directory] = client
+    return client
+
+
+def _number_or_na(value: Any) -> Any:
+    """Numeric strategy fields as native floats for Chroma metadata; 'N/A' when missing."""
+    if value is None or value == "":
+        return "N/A"
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _distance_to_similarity(distance, space: str):
+    """
+    Cosine similarity from a Chroma distance (float or array).
+
+    cosine/ip distances are 1 - cos. l2 is squared L2, which for the unit-norm
+    MiniLM embeddings is 2 - 2·cos, so min_similarity means the same thing in
+    collections created before the switch to cosine space.
+    """
+    if space == "l2":
+        return 1 - distance / 2
+    return 1 - distance
+
+
+def _build_where(ticker: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Chroma where clause for a ticker plus extra metadata filters, so pruning
+    happens inside the vector search instead of in Python afterwards.
+
+    filters maps field -> value or operator dict, e.g.
+    {"action": "BUY", "sector": {"$in": ["Technology", "Semiconductors"]}}.
+    """
+    clauses = [{"ticker": ticker}] if ticker else []
+    clauses += [{field: condition} for field, condition in (filters or {}).items()]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def _id_created_key(memory_id: str) -> int:
+    """
+    Creation time (ns since epoch) encoded in a memory ID, for ordering.
+
+    Current IDs are TICKER_<time_ns>_<pid>; older ones were
+    TICKER_YYYYMMDD_HHMMSS[_ffffff]. Unparseable IDs sort oldest.
+    """
+    stamp = memory_id.split("_", 1)[-1]
+    head = stamp.split("_", 1)[0]
+    if len(head) > 8 and head.isdigit():
+        return int(head)
+    for fmt in ("%Y%m%d_%H%M%S_%f", "%Y%m%d_%H%M%S"):
+        try:
+            return int(datetime.strptime(stamp, fmt).timestamp() * 1_000_000) * 1000
+        except ValueError:
+            continue
+    return 0
+
+
+@lru_cache(maxsize=None)
+def _get_model(name: str):
+    """Load a SentenceTransformer once per process (weights are shared by all instances)."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+@lru_cache(maxsize=1)
+def _get_embedder():
+    """
+    Batch encoder for buffered writes, or None to let ChromaDB embed.
+
+    Uses sentence-transformers (optional `embeddings` extra) with the same
+    all-MiniLM-L6-v2 model as Chroma's default embedding function, so stored
+    vectors stay comparable with query_texts embedded by the collection.
+    """
+    try:
+        model = _get_model(EMBEDDING_MODEL)
+    except ImportError:
+        return None
+
+    def encode(documents: List[str]) -> List[List[float]]:
+        return model.encode(
+            documents,
+            batch_size=32,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).tolist()
+
+    return encode
+
+
+@lru_cache(maxsize=1)
+def _get_query_embedder():
+    """
+    Encoder for query strings: the batch encoder when available, else Chroma's
+    default embedding function (the one the collection itself uses). None if
+    neither can be loaded, in which case queries fall back to query_texts.
+    """
+    embed = _get_embedder()
+    if embed is not None:
+        return embed
+    try:
+        from chromadb.utils import embedding_functions
+        default_ef = embedding_functions.DefaultEmbeddingFunction()
+    except Exception:
+        return None
+    return lambda documents: [[float(x) for x in vector] for vector in default_ef(documents)]
+
+
+@lru_cache(maxsize=QUERY_EMBED_CACHE_SIZE)
+def _embed_query(text: str) -> Optional[tuple]:
+    """Embedding for a query string, memoized so repeated queries skip the model."""
+    embed = _get_query_embedder()
+    if embed is None:
+        return None
+    return tuple(embed([text])[0])
+
+
+def _query_input(text: str) -> Dict[str, Any]:
+    """collection.query kwargs for text: precomputed embedding when possible."""
+    embedding = _embed_query(text)
+    if embedding is None:
+        return {"query_texts": [text]}
+    return {"query_embeddings": [list(embedding)]}
 
 
 class FinancialMemory:
@@ -18,36 +239,78 @@ class FinancialMemory:
     Enables agents to learn from past mistakes and successes.
     """
     
-    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "nexustrader_memory"):
+    def __init__(
+        self,
+        persist_directory: Optional[str] = "./chroma_db",
+        collection_name: str = "nexustrader_memory",
+        expected_size: int = 0,
+        hnsw_space: str = "cosine",
+        hnsw_m: Optional[int] = None,
+        hnsw_construction_ef: Optional[int] = None,
+        hnsw_search_ef: Optional[int] = None,
+    ):
         """
         Initialize the financial memory system.
         
         Args:
-            persist_directory: Directory to persist ChromaDB data
+            persist_directory: Directory to persist ChromaDB data, or None for an
+                in-memory collection (tests; nothing is written to disk)
             collection_name: Name of the collection for storing memories
+            expected_size: Anticipated number of memories; picks the HNSW
+                defaults (see hnsw_params_for)
+            hnsw_space: Distance metric for the index
+            hnsw_m: Override for HNSW graph degree (hnsw:M)
+            hnsw_construction_ef: Override for hnsw:construction_ef
+            hnsw_search_ef: Override for hnsw:search_ef
+
+        HNSW settings only apply when the collection is first created; an
+        existing collection keeps the ones it was built with.
         """
-        # Create ChromaDB client with persistence
-        try:
-            # New ChromaDB (0.4+)
-            self.client = chromadb.PersistentClient(path=persist_directory)
-        except AttributeError:
-            # Old ChromaDB (<0.4)
-            self.client = chromadb.Client(Settings(
-                persist_directory=persist_directory,
-                anonymized_telemetry=False
-            ))
+        overrides = {
+            "hnsw:M": hnsw_m,
+            "hnsw:construction_ef": hnsw_construction_ef,
+            "hnsw:search_ef": hnsw_search_ef,
+        }
+        self.collection_metadata = {
+            **COLLECTION_METADATA,
+            "hnsw:space": hnsw_space,
+            **hnsw_params_for(expected_size),
+            **{k: v for k, v in overrides.items() if v is not None},
+        }
+
+        # Client and collection handles are shared process-wide, so re-instantiating
+        # (tests, scripts, request handlers) doesn't reopen SQLite / reload HNSW
+        if persist_directory is not None:
+            persist_directory = os.path.abspath(persist_directory)
+        self.client = _get_client(persist_directory)
         
-        # Get or create collection
         # Using default embedding function (all-MiniLM-L6-v2) - no API needed!
-        try:
-            self.collection = self.client.get_collection(name=collection_name)
-            print(f"[MEMORY] Loaded existing collection: {collection_name}")
-        except:
-            self.collection = self.client.create_collection(
+        key = (persist_directory, collection_name)
+        self._collection_key = key
+        if key not in _COLLECTIONS:
+            _COLLECTIONS[key] = self.client.get_or_create_collection(
                 name=collection_name,
-                metadata={"description": "NexusTrader financial analysis memory"}
+                metadata=self.collection_metadata
             )
-            print(f"[MEMORY] Created new collection: {collection_name}")
+            print(f"[MEMORY] Opened collection: {collection_name} ({self.collection.count()} memories)")
+
+        # Write buffer and query memo are per collection, not per instance
+        # (see _CollectionState); the locks and memo are aliased for brevity
+        self._shared = _COLLECTION_STATE.setdefault(key, _CollectionState())
+        self._lock = self._shared.lock
+        self._flush_lock = self._shared.flush_lock
+        self._query_memo = self._shared.query_memo
+        _LIVE_INSTANCES.add(self)
+    
+    @property
+    def collection(self):
+        """The shared handle for this collection (clear_all on any instance replaces it)."""
+        return _COLLECTIONS[self._collection_key]
+    
+    @property
+    def _space(self) -> str:
+        """Distance metric the collection was created with (Chroma's default is l2)."""
+        return (self.collection.metadata or {}).get("hnsw:space", "l2")
     
     def store_analysis(
         self,
@@ -78,8 +341,67 @@ class FinancialMemory:
         Returns:
             Memory ID (string)
         """
-        # Create a unique ID
-        memory_id = f"{ticker}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        memory_id, document_text, meta = self._build_record(
+            ticker, analysis_summary, bull_arguments, bear_arguments, final_decision,
+            strategy, metadata, final_state_json, reports
+        )
+
+        # Queue for a batched add; reads flush first, so callers still see it
+        with self._lock:
+            self._shared.pending["ids"].append(memory_id)
+            self._shared.pending["documents"].append(document_text)
+            self._shared.pending["metadatas"].append(meta)
+            batch_full = len(self._shared.pending["ids"]) >= BATCH_SIZE
+            if not batch_full and self._shared.flush_timer is None:
+                self._shared.flush_timer = threading.Timer(FLUSH_DELAY_SECONDS, self._flush_in_background)
+                self._shared.flush_timer.daemon = True
+                self._shared.flush_timer.start()
+        if batch_full:
+            self.flush()
+        
+        print(f"[MEMORY] Stored analysis for {ticker} with ID: {memory_id}")
+        return memory_id
+
+    def store_analyses_bulk(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store several analyses with one embedding call and one collection.add.
+
+        Args:
+            records: List of dicts with the same keys as store_analysis' arguments
+
+        Returns:
+            Memory IDs, in the same order as records
+        """
+        built = [self._build_record(**record) for record in records]
+        with self._lock:
+            for memory_id, document_text, meta in built:
+                self._shared.pending["ids"].append(memory_id)
+                self._shared.pending["documents"].append(document_text)
+                self._shared.pending["metadatas"].append(meta)
+        self.flush()
+
+        memory_ids = [memory_id for memory_id, _, _ in built]
+        print(f"[MEMORY] Stored {len(memory_ids)} analyses in one batch")
+        return memory_ids
+
+    def _build_record(
+        self,
+        ticker: str,
+        analysis_summary: str,
+        bull_arguments: str,
+        bear_arguments: str,
+        final_decision: str,
+        strategy: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        final_state_json: Optional[str] = None,
+        reports: Optional[Dict[str, str]] = None
+    ) -> tuple:
+        """Build the (id, document, metadata) triple for one analysis."""
+        # Unique ID: nanosecond clock + pid, so parallel runs for the same
+        # ticker can't collide; still ordered by creation time
+        created_ns = time.time_ns()
+        memory_id = f"{ticker}_{created_ns}_{os.getpid()}"
+        now = datetime.fromtimestamp(created_ns / 1e9)
         
         # Extract analyst reports if provided
         reports = reports or {}
@@ -119,12 +441,13 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         # This enables future queries like "find analyses with RSI > 70"
         meta = {
             "ticker": ticker,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
+            "created_at_ts": int(now.timestamp()),  # Numeric sort / window-filter key
             "action": strategy.get('action', 'UNKNOWN'),
-            "entry_price": str(strategy.get('entry_price') or 'N/A'),
-            "take_profit": str(strategy.get('take_profit') or 'N/A'),
-            "stop_loss": str(strategy.get('stop_loss') or 'N/A'),
-            "position_size_pct": str(strategy.get('position_size_pct', 0)),
+            "entry_price": _number_or_na(strategy.get('entry_price')),
+            "take_profit": _number_or_na(strategy.get('take_profit')),
+            "stop_loss": _number_or_na(strategy.get('stop_loss')),
+            "position_size_pct": _number_or_na(strategy.get('position_size_pct', 0)),
             "outcome": "PENDING",  # Will be updated later
             "final_state_json": final_state_json or "", # Store full state for UI replay
             **{k: v for k, v in (metadata or {}).items() if v is not None},
@@ -132,16 +455,54 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         # ChromaDB only accepts bool | int | float | str — coerce any remaining non-str to str
         meta = {k: (str(v) if not isinstance(v, (bool, int, float, str)) else v)
                 for k, v in meta.items()}
+        return memory_id, document_text, meta
+    
+    def flush(self):
+        """
+        Write all buffered analyses to ChromaDB in a single collection.add.
 
-        # Store in ChromaDB
-        self.collection.add(
-            documents=[document_text],
-            metadatas=[meta],
-            ids=[memory_id]
-        )
-        
-        print(f"[MEMORY] Stored analysis for {ticker} with ID: {memory_id}")
-        return memory_id
+        One batched add amortizes the per-call embedding, HNSW insert and WAL
+        sync. Every read path calls this first (read-your-writes). If embedding
+        or the add fails, the batch goes back into the buffer and the error is
+        re-raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._shared.flush_timer is not None:
+                    self._shared.flush_timer.cancel()
+                    self._shared.flush_timer = None
+                if not self._shared.pending["ids"]:
+                    return
+                pending = self._shared.pending
+                self._shared.pending = {"ids": [], "documents": [], "metadatas": []}
+            # Embed the whole batch in one encode() call when sentence-transformers
+            # is available; otherwise Chroma's embedding function does it on add.
+            # _lock is released meanwhile so store_analysis doesn't block on it;
+            # a concurrent reader's flush waits on _flush_lock, so it still sees
+            # these records once it returns
+            try:
+                embed = _get_embedder()
+                if embed is not None:
+                    pending["embeddings"] = embed(pending["documents"])
+                with self._lock:
+                    self.collection.add(**pending)
+                    self._query_memo.clear()
+            except Exception:
+                # store_analysis already handed out these IDs: put the batch back
+                # ahead of anything queued since, so the next flush retries it
+                with self._lock:
+                    for field in ("ids", "documents", "metadatas"):
+                        self._shared.pending[field][:0] = pending[field]
+                raise
+    
+    def _flush_in_background(self):
+        """Timer target: a failed flush keeps its batch queued, so just report it."""
+        try:
+            self.flush()
+        except Exception as e:
+            with self._lock:
+                queued = len(self._shared.pending["ids"])
+            print(f"[MEMORY] Background flush failed ({queued} analyses kept for retry): {e}")
     
     def update_outcome(
         self,
@@ -159,31 +520,59 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
             profit_loss_pct: Actual profit/loss percentage
             lessons_learned: What went right or wrong
         """
-        # Get existing data
-        result = self.collection.get(ids=[memory_id], include=["metadatas", "documents"])
-        
+        self.update_outcomes_bulk([{
+            "memory_id": memory_id,
+            "actual_outcome": actual_outcome,
+            "profit_loss_pct": profit_loss_pct,
+            "lessons_learned": lessons_learned,
+        }])
+
+    def update_outcomes_bulk(self, updates: List[Dict[str, Any]]):
+        """
+        Update several past analyses with one get and one collection.update.
+
+        Args:
+            updates: List of dicts with the same keys as update_outcome's arguments
+        """
+        self.flush()
+        by_id = {u["memory_id"]: u for u in updates}
+        # Only the metadata changes, so don't pull the documents back
+        result = self.collection.get(ids=list(by_id), include=["metadatas"])
+
+        for missing in by_id.keys() - set(result['ids']):
+            print(f"[MEMORY] Warning: Memory ID {missing} not found")
         if not result['ids']:
-            print(f"[MEMORY] Warning: Memory ID {memory_id} not found")
             return
-        
-        # Update metadata
-        meta = result['metadatas'][0].copy()
-        meta['outcome'] = actual_outcome
-        meta['profit_loss_pct'] = str(profit_loss_pct)  # Store as string for JSON compatibility
-        meta['lessons_learned'] = lessons_learned
-        meta['updated_at'] = datetime.now().isoformat()
-        
-        # ChromaDB doesn't have direct update, so we delete and re-add with same ID
-        document = result['documents'][0]
-        
-        self.collection.delete(ids=[memory_id])
-        self.collection.add(
-            documents=[document],
-            metadatas=[meta],
-            ids=[memory_id]
-        )
-        
-        print(f"[MEMORY] Updated outcome for {memory_id}: {actual_outcome} ({profit_loss_pct:+.2f}%)")
+
+        ids, metas = [], []
+        updated_at = datetime.now().isoformat()
+        for memory_id, old_meta in zip(result['ids'], result['metadatas']):
+            update = by_id[memory_id]
+            profit_loss_pct = update['profit_loss_pct']
+            meta = old_meta.copy()
+            meta['outcome'] = update['actual_outcome']
+            meta['profit_loss_pct'] = float(profit_loss_pct)  # Native float: where-filterable, no parsing on read
+            meta['is_win'] = profit_loss_pct > 0  # Lets win counts become a where-count later
+            meta['lessons_learned'] = update['lessons_learned']
+            meta['updated_at'] = updated_at
+            ids.append(memory_id)
+            metas.append(meta)
+
+        with self._lock:
+            self._query_memo.clear()
+
+        # Metadata-only update: no re-embedding of the documents, no HNSW delete/insert
+        try:
+            self.collection.update(ids=ids, metadatas=metas)
+        except AttributeError:
+            # Older ChromaDB without Collection.update - upsert keeps the same IDs
+            documents = self.collection.get(ids=ids, include=["documents"])
+            doc_by_id = dict(zip(documents['ids'], documents['documents']))
+            self.collection.upsert(ids=ids, documents=[doc_by_id[i] for i in ids], metadatas=metas)
+
+        for memory_id in ids:
+            update = by_id[memory_id]
+            print(f"[MEMORY] Updated outcome for {memory_id}: {update['actual_outcome']} ({update['profit_loss_pct']:+.2f}%)")
     
     def get_similar_past_analyses(
         self,
@@ -192,6 +581,7 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         n_results: int = 3,
         min_similarity: float = 0.3,
         max_simulated_date: Optional[str] = None,  # No-leak guard: exclude memories on or after this date
+        filters: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find similar past analyses based on current situation.
@@ -204,10 +594,23 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
             max_simulated_date: ISO date string (YYYY-MM-DD). Only memories with
                 simulated_date strictly before this date are eligible. Use this to
                 enforce the no-look-ahead policy: pass (current_simulated_date - k_trading_days).
+            filters: Extra metadata filters (see _build_where), applied in the query
 
         Returns:
             List of similar past analyses with similarity scores
         """
+        self.flush()
+        memo_key = (
+            hashlib.blake2b(current_situation.encode(), digest_size=16).digest(),
+            ticker, n_results, min_similarity, max_simulated_date,
+            json.dumps(filters, sort_keys=True) if filters else None,
+        )
+        with self._lock:
+            memoized = self._query_memo.get(memo_key)
+            if memoized is not None:
+                self._query_memo.move_to_end(memo_key)
+                return list(memoized)
+
         # Check if collection is empty
         count = self.collection.count()
         if count == 0:
@@ -217,13 +620,14 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         # Fetch more than needed so we can post-filter by date without under-returning
         fetch_n = min(n_results * 4, count)
 
-        # Build where filter if ticker specified
-        where_filter = {"ticker": ticker} if ticker else None
+        # Ticker/metadata filters are pushed into the query so Chroma prunes
+        # candidates during the search
+        where_filter = _build_where(ticker, filters)
 
         # Query ChromaDB
         try:
             results = self.collection.query(
-                query_texts=[current_situation],
+                **_query_input(current_situation),
                 n_results=fetch_n,
                 where=where_filter,
                 include=["documents", "metadatas", "distances"]
@@ -235,9 +639,9 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         # Format results with no-leak date filtering
         similar_analyses = []
         if results['ids'] and results['ids'][0]:
+            space = self._space
             for i in range(len(results['ids'][0])):
-                distance = results['distances'][0][i]
-                similarity = 1 - distance
+                similarity = _distance_to_similarity(results['distances'][0][i], space)
                 meta = results['metadatas'][0][i]
 
                 # No-leak guard: skip memories from on or after max_simulated_date
@@ -257,13 +661,171 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
                         break
 
         print(f"[MEMORY] Found {len(similar_analyses)} eligible past analyses (no-leak cutoff: {max_simulated_date or 'none'})")
-        return similar_analyses
+        with self._lock:
+            self._query_memo[memo_key] = similar_analyses
+            while len(self._query_memo) > QUERY_MEMO_SIZE:
+                self._query_memo.popitem(last=False)
+        return list(similar_analyses)
     
+    def mmr_similar(
+        self,
+        query: str,
+        n: int = 3,
+        lambda_: float = 0.5,
+        fetch_k: int = 20,
+        ticker: Optional[str] = None,
+        max_simulated_date: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Similar past analyses re-ranked for diversity (Maximal Marginal Relevance).
+
+        One query fetches fetch_k candidates with their embeddings and
+        distances; the candidate/candidate cosine similarities are computed
+        once as a NumPy matrix product and the greedy MMR selection works on
+        those arrays.
+
+        Args:
+            query: Description of current market/stock situation
+            n: Number of results to return
+            lambda_: Relevance/diversity trade-off (1.0 = pure relevance)
+            fetch_k: Candidates to re-rank
+            ticker: Optional ticker to filter by
+            max_simulated_date: Same no-leak cutoff as get_similar_past_analyses
+            filters: Extra metadata filters (see _build_where)
+
+        Returns:
+            Selected analyses (id, document, metadata, similarity), in MMR order
+        """
+        self.flush()
+        count = self.collection.count()
+        if count == 0 or n <= 0:
+            return []
+
+        try:
+            results = self.collection.query(
+                **_query_input(query),
+                n_results=min(fetch_k, count),
+                where=_build_where(ticker, filters),
+                include=["embeddings", "documents", "metadatas", "distances"]
+            )
+        except Exception as e:
+            print(f"[MEMORY] Query error: {str(e)}")
+            return []
+
+        ids = results['ids'][0] if results['ids'] else []
+        metadatas = results['metadatas'][0] if ids else []
+        keep = [
+            i for i, meta in enumerate(metadatas)
+            if not max_simulated_date or meta.get('simulated_date', '') < max_simulated_date
+        ]
+        if not keep:
+            return []
+
+        E = np.asarray(results['embeddings'][0], dtype=np.float32)[keep]
+        E /= np.maximum(np.linalg.norm(E, axis=1, keepdims=True), 1e-12)
+        # Query relevance comes from Chroma's distances (same scale as
+        # get_similar_past_analyses); only candidate/candidate needs the matrix
+        relevance = _distance_to_similarity(
+            np.asarray(results['distances'][0], dtype=np.float32)[keep], self._space
+        )
+        pairwise = E @ E.T
+
+        selected: List[int] = []
+        candidates = np.ones(len(keep), dtype=bool)
+        max_sim_to_selected = np.full(len(keep), -np.inf, dtype=np.float32)
+        for _ in range(min(n, len(keep))):
+            if selected:
+                scores = lambda_ * relevance - (1 - lambda_) * max_sim_to_selected
+            else:
+                scores = relevance.copy()
+            scores[~candidates] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            candidates[best] = False
+            np.maximum(max_sim_to_selected, pairwise[best], out=max_sim_to_selected)
+
+        return [
+            {
+                "id": ids[keep[i]],
+                "document": results['documents'][0][keep[i]],
+                "metadata": metadatas[keep[i]],
+                "similarity": float(relevance[i]),
+            }
+            for i in selected
+        ]
+
+    async def astore_analysis(self, *args, **kwargs) -> str:
+        """store_analysis on a worker thread, for callers on the event loop."""
+        return await asyncio.to_thread(self.store_analysis, *args, **kwargs)
+
+    async def aget_similar_past_analyses(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """get_similar_past_analyses on a worker thread, for callers on the event loop."""
+        return await asyncio.to_thread(self.get_similar_past_analyses, *args, **kwargs)
+
+    def migrate_numeric_pnl(self) -> int:
+        """
+        Convert string profit_loss_pct values (older records) to floats.
+
+        One-off migration so the numeric where-filters in get_past_mistakes /
+        get_success_patterns also see older outcomes; update_outcome always
+        writes a float. Run once at startup (initialize_memory does), not on
+        reads. Values that don't parse as a number (e.g. "N/A") are left as is.
+
+        Returns:
+            Number of records converted
+        """
+        self.flush()
+        legacy = self.collection.get(
+            where={"outcome": {"$ne": "PENDING"}},
+            include=["metadatas"]
+        )
+        ids, metas = [], []
+        for memory_id, meta in zip(legacy['ids'] or [], legacy['metadatas'] or []):
+            profit_loss = meta.get('profit_loss_pct')
+            if not isinstance(profit_loss, str):
+                continue
+            try:
+                value = float(profit_loss)
+            except ValueError:
+                continue
+            ids.append(memory_id)
+            metas.append({**meta, 'profit_loss_pct': value})
+        if not ids:
+            return 0
+
+        self.collection.update(ids=ids, metadatas=metas)
+        with self._lock:
+            self._query_memo.clear()
+        print(f"[MEMORY] Converted profit_loss_pct to numbers on {len(ids)} records")
+        return len(ids)
+
+    def _get_by_pnl(
+        self,
+        pnl_filter: Dict[str, float],
+        ticker: Optional[str],
+        include_documents: bool,
+    ) -> List[Dict[str, Any]]:
+        """Fetch records whose numeric P/L matches pnl_filter (e.g. {"$lte": -5.0})."""
+        self.flush()
+        where = _build_where(ticker, {"profit_loss_pct": pnl_filter})
+        include = ["metadatas", "documents"] if include_documents else ["metadatas"]
+        results = self.collection.get(where=where, include=include)
+
+        records = []
+        for i, memory_id in enumerate(results['ids'] or []):
+            record = {"id": memory_id, "metadata": results['metadatas'][i]}
+            if include_documents:
+                record["document"] = results['documents'][i]
+            records.append(record)
+        return records
+
     def get_past_mistakes(
         self,
         ticker: Optional[str] = None,
         min_loss_pct: float = -5.0,
-        n_results: int = 5
+        n_results: int = 5,
+        include_documents: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Retrieve past analyses that resulted in losses.
@@ -272,36 +834,22 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
             ticker: Optional ticker to filter by
             min_loss_pct: Minimum loss percentage to consider (negative number)
             n_results: Maximum number of results
+            include_documents: Also return the stored document text
             
         Returns:
             List of past mistakes with lessons learned
         """
-        # Get all memories with outcomes
-        all_results = self.collection.get(
-            where={"ticker": ticker} if ticker else None,
-            include=["documents", "metadatas"]
-        )
+        # Loss filter runs inside ChromaDB; only matching rows come back
+        mistakes = self._get_by_pnl({"$lte": min_loss_pct}, ticker, include_documents)
         
-        # Filter for losses
-        mistakes = []
-        if all_results['ids']:
-            for i, meta in enumerate(all_results['metadatas']):
-                profit_loss = meta.get('profit_loss_pct')
-                if profit_loss and float(profit_loss) <= min_loss_pct:
-                    mistakes.append({
-                        "id": all_results['ids'][i],
-                        "document": all_results['documents'][i],
-                        "metadata": meta
-                    })
-        
-        # Sort by loss (worst first) and limit
-        mistakes.sort(key=lambda x: float(x['metadata'].get('profit_loss_pct', 0)))
-        return mistakes[:n_results]
+        # Worst losses first, limited - O(N log n_results) instead of a full sort
+        return heapq.nsmallest(n_results, mistakes, key=lambda x: x['metadata']['profit_loss_pct'])
     
     def get_success_patterns(
         self,
         min_profit_pct: float = 5.0,
-        n_results: int = 5
+        n_results: int = 5,
+        include_documents: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Retrieve past analyses that resulted in profits.
@@ -309,29 +857,15 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         Args:
             min_profit_pct: Minimum profit percentage to consider
             n_results: Maximum number of results
+            include_documents: Also return the stored document text
             
         Returns:
             List of successful analyses
         """
-        all_results = self.collection.get(
-            include=["documents", "metadatas"]
-        )
+        successes = self._get_by_pnl({"$gte": min_profit_pct}, None, include_documents)
         
-        # Filter for successes
-        successes = []
-        if all_results['ids']:
-            for i, meta in enumerate(all_results['metadatas']):
-                profit_loss = meta.get('profit_loss_pct')
-                if profit_loss and float(profit_loss) >= min_profit_pct:
-                    successes.append({
-                        "id": all_results['ids'][i],
-                        "document": all_results['documents'][i],
-                        "metadata": meta
-                    })
-        
-        # Sort by profit (best first) and limit
-        successes.sort(key=lambda x: float(x['metadata'].get('profit_loss_pct', 0)), reverse=True)
-        return successes[:n_results]
+        # Best profits first, limited - O(N log n_results) instead of a full sort
+        return heapq.nlargest(n_results, successes, key=lambda x: x['metadata']['profit_loss_pct'])
     
     def get_all_analyses(
         self,
@@ -340,23 +874,28 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         """
         Retrieve all past analyses sorted by most recent.
         """
-        all_results = self.collection.get(
-            include=["documents", "metadatas"]
-        )
-        
-        analyses = []
-        if all_results['ids']:
-            for i, _id in enumerate(all_results['ids']):
-                analyses.append({
-                    "id": _id,
-                    "document": all_results['documents'][i],
-                    "metadata": all_results['metadatas'][i]
-                })
+        self.flush()
+        # Phase 1: IDs only - metadatas carry the full final_state_json, so
+        # don't ship any payload for rows we drop. IDs are TICKER_<creation
+        # time>_..., so rank on the decoded time (not the whole ID, which
+        # would order by ticker first)
+        id_results = self.collection.get(include=[])
+        top_ids = heapq.nlargest(limit, id_results['ids'] or [], key=_id_created_key)
+        if not top_ids:
+            return []
         
-        # Sort by timestamp (descending)
-        # ID format is often TICKER_YYYYMMDD_HHMMSS
-        analyses.sort(key=lambda x: x['id'], reverse=True)
-        return analyses[:limit]
+        # Phase 2: documents + metadata for the page being returned,
+        # newest first by the numeric creation time (older records: ID time)
+        page = self.collection.get(ids=top_ids, include=["documents", "metadatas"])
+        analyses = [
+            {"id": _id, "document": document, "metadata": meta}
+            for _id, document, meta in zip(page['ids'], page['documents'], page['metadatas'])
+        ]
+        analyses.sort(
+            key=lambda x: (x['metadata'].get('created_at_ts', 0), _id_created_key(x['id'])),
+            reverse=True,
+        )
+        return analyses
 
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -365,9 +904,9 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         Returns:
             Dictionary with statistics (total memories, win rate, etc.)
         """
-        all_results = self.collection.get(include=["metadatas"])
-        
-        total = len(all_results['ids']) if all_results['ids'] else 0
+        self.flush()
+        # Total is an O(1) count; only completed rows are pulled for the aggregates
+        total = self.collection.count()
         
         if total == 0:
             return {
@@ -377,20 +916,23 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
                 "average_pnl": 0
             }
         
+        completed_results = self.collection.get(
+            where={"outcome": {"$ne": "PENDING"}},
+            include=["metadatas"]
+        )
+        
         # Count outcomes
         completed = 0
         wins = 0
         total_pnl = 0
         
-        for meta in all_results['metadatas']:
-            if meta.get('outcome') != 'PENDING':
-                completed += 1
-                pnl = meta.get('profit_loss_pct')
-                if pnl:
-                    pnl_float = float(pnl)
-                    total_pnl += pnl_float
-                    if pnl_float > 0:
-                        wins += 1
+        for meta in completed_results['metadatas'] or []:
+            completed += 1
+            pnl = meta.get('profit_loss_pct')
+            if isinstance(pnl, (int, float)) and pnl:  # unparseable legacy strings are skipped
+                total_pnl += pnl
+                if pnl > 0:
+                    wins += 1
         
         win_rate = (wins / completed * 100) if completed > 0 else 0
         avg_pnl = (total_pnl / completed) if completed > 0 else 0
@@ -409,27 +951,50 @@ Rationale: {strategy.get('rationale', 'N/A')[:400] if strategy.get('rationale')
         """
         Clear all memories (use with caution!).
         """
-        # Delete collection and recreate
+        # Delete collection and recreate (pending writes are dropped with it)
+        with self._flush_lock, self._lock:
+            self._shared.pending = {"ids": [], "documents": [], "metadatas": []}
+            self._query_memo.clear()
         collection_name = self.collection.name
         self.client.delete_collection(name=collection_name)
-        self.collection = self.client.create_collection(
+        _COLLECTIONS[self._collection_key] = self.client.create_collection(
             name=collection_name,
-            metadata={"description": "NexusTrader financial analysis memory"}
+            metadata=self.collection_metadata
         )
         print(f"[MEMORY] Cleared all memories from {collection_name}")
 
 
+# Every live FinancialMemory, flushed once at interpreter exit. Weak references,
+# so instances dropped by tests and scripts are still garbage collected
+_LIVE_INSTANCES: "weakref.WeakSet[FinancialMemory]" = weakref.WeakSet()
+
+
+def _flush_all_instances():
+    for memory in list(_LIVE_INSTANCES):
+        try:
+            memory.flush()
+        except Exception as e:
+            print(f"[MEMORY] Flush at exit failed: {e}")
+
+
+atexit.register(_flush_all_instances)
+
+
 # Global memory instance (initialized in main.py)
 _memory_instance = None
+_memory_lock = threading.Lock()
 
 
 def get_memory() -> FinancialMemory:
     """
-    Get the global memory instance.
+    Get the global memory instance (shared by all request threads).
     """
     global _memory_instance
     if _memory_instance is None:
-        _memory_instance = FinancialMemory()
+        with _memory_lock:
+            if _memory_instance is None:
+                _memory_instance = FinancialMemory()
+                _memory_instance.migrate_numeric_pnl()
     return _memory_instance
 
 
@@ -440,4 +1005,5 @@ def initialize_memory(persist_directory: str = "./chroma_db") -> FinancialMemory
     """
     global _memory_instance
     _memory_instance = FinancialMemory(persist_directory=persist_directory)
+    _memory_instance.migrate_numeric_pnl()
     return _memory_instance
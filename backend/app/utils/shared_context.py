@@ -5,7 +5,10 @@ Shared context manager to store fetched data and avoid redundant API calls.
 This allows multiple agents to access the same data without re-fetching.
 """
 
-from typing import Dict, Any, Optional
+import contextvars
+import threading
+import types
+from typing import Dict, Any, Mapping, Optional
 
 
 class SharedDataContext:
@@ -15,11 +18,27 @@ class SharedDataContext:
     """
     
     def __init__(self):
-        self._data = {}
+        # Copy-on-write: writers swap in a new read-only snapshot under the lock,
+        # readers just load the current one (no lock, never see a half-resized dict)
+        self._data: Mapping[str, Any] = types.MappingProxyType({})
+        self._lock = threading.Lock()
+        # Per-ticker bundles for the convenience methods: one lookup on the
+        # ticker instead of building and hashing a key string per field.
+        # Same copy-on-write snapshots as _data, written via _put.
+        self._social: Mapping[str, Dict[str, str]] = types.MappingProxyType({})
+        self._news: Mapping[str, str] = types.MappingProxyType({})
+        self._financial: Mapping[str, Dict[str, Any]] = types.MappingProxyType({})
+    
+    def _put(self, attr: str, key: str, value: Any):
+        """Swap in a copy of the snapshot stored at attr with key set to value."""
+        with self._lock:
+            data = dict(getattr(self, attr))
+            data[key] = value
+            setattr(self, attr, types.MappingProxyType(data))
     
     def set(self, key: str, value: Any):
         """Store data in shared context."""
-        self._data[key] = value
+        self._put("_data", key, value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve data from shared context."""
@@ -31,62 +50,55 @@ class SharedDataContext:
     
     def clear(self):
         """Clear all shared data."""
-        self._data.clear()
+        empty = types.MappingProxyType({})
+        with self._lock:
+            self._data = empty
+            self._social = empty
+            self._news = empty
+            self._financial = empty
     
     # Convenience methods for common data
     
     def set_social_data(self, ticker: str, twitter: str, reddit: str, stocktwits: str):
         """Store social media data for reuse."""
-        self.set(f"social_{ticker}_twitter", twitter)
-        self.set(f"social_{ticker}_reddit", reddit)
-        self.set(f"social_{ticker}_stocktwits", stocktwits)
+        self._put("_social", ticker, {"twitter": twitter, "reddit": reddit, "stocktwits": stocktwits})
     
     def get_social_data(self, ticker: str) -> Optional[Dict[str, str]]:
         """Retrieve cached social media data."""
-        if self.has(f"social_{ticker}_twitter"):
-            return {
-                "twitter": self.get(f"social_{ticker}_twitter"),
-                "reddit": self.get(f"social_{ticker}_reddit"),
-                "stocktwits": self.get(f"social_{ticker}_stocktwits"),
-            }
-        return None
+        return self._social.get(ticker)
     
     def set_news_data(self, ticker: str, news: str):
         """Store news data for reuse."""
-        self.set(f"news_{ticker}", news)
+        self._put("_news", ticker, news)
     
     def get_news_data(self, ticker: str) -> Optional[str]:
         """Retrieve cached news data."""
-        return self.get(f"news_{ticker}")
+        return self._news.get(ticker)
     
     def set_financial_data(self, ticker: str, statements: Dict, ratios: Dict, ratings: Dict):
         """Store financial data for reuse."""
-        self.set(f"financial_{ticker}_statements", statements)
-        self.set(f"financial_{ticker}_ratios", ratios)
-        self.set(f"financial_{ticker}_ratings", ratings)
+        self._put("_financial", ticker, {"statements": statements, "ratios": ratios, "ratings": ratings})
     
     def get_financial_data(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached financial data."""
-        if self.has(f"financial_{ticker}_statements"):
-            return {
-                "statements": self.get(f"financial_{ticker}_statements"),
-                "ratios": self.get(f"financial_{ticker}_ratios"),
-                "ratings": self.get(f"financial_{ticker}_ratings"),
-            }
-        return None
+        return self._financial.get(ticker)
 
 
-# Global shared context instance
-shared_context = SharedDataContext()
+# Per-request shared context: each request (thread or asyncio task) sees its own
+# instance, so concurrent analyses can't overwrite each other's data
+_shared_ctx: contextvars.ContextVar[SharedDataContext] = contextvars.ContextVar("shared_ctx")
 
 
-def initialize_context():
+def initialize_context() -> SharedDataContext:
     """Initialize a new shared context for an analysis run."""
-    global shared_context
-    shared_context = SharedDataContext()
-    return shared_context
+    context = SharedDataContext()
+    _shared_ctx.set(context)
+    return context
 
 
 def get_shared_context() -> SharedDataContext:
-    """Get the current shared context."""
-    return shared_context
+    """Get the current shared context (created on first use in this context)."""
+    try:
+        return _shared_ctx.get()
+    except LookupError:
+        return initialize_context()
@@ -5,15 +5,24 @@ Run the API server first, then execute this script.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://127.0.0.1:8000"
 
+# One keep-alive session for every request this script makes
+SESSION = requests.Session()
+SESSION.mount(
+    "http://",
+    HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.1)),
+)
+
 
 def test_chart_endpoint(ticker: str = "AAPL", period: str = "6mo"):
     url = f"{BASE_URL}/api/chart/{ticker}?period={period}"
     print(f"Testing: {url}")
 
-    resp = requests.get(url, timeout=30)
+    resp = SESSION.get(url, timeout=30)
     resp.raise_for_status()
     payload = resp.json()
 
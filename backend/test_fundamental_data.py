@@ -1,6 +1,7 @@
 # In nexustrader/backend/test_fundamental_data.py
 import yfinance as yf
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 def test_nvda_financials():
     """
@@ -14,9 +15,15 @@ def test_nvda_financials():
         # This is the same library our agent's tool uses
         nvda = yf.Ticker(ticker_symbol)
         
-        # 1. Fetch Annual Income Statement
+        # Both statements are separate Yahoo requests - fetch them concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            income_future = pool.submit(lambda: nvda.income_stmt)
+            balance_future = pool.submit(lambda: nvda.balance_sheet)
+            income_stmt = income_future.result()
+            balance_sheet = balance_future.result()
+        
+        # 1. Annual Income Statement
         print("\n--- Annual Income Statement ---")
-        income_stmt = nvda.income_stmt
         if not income_stmt.empty:
             # yfinance returns columns with dates. We'll display the column headers.
             print("Available years (columns):")
@@ -27,9 +34,8 @@ def test_nvda_financials():
         else:
             print("No annual income statement data found.")
 
-        # 2. Fetch Annual Balance Sheet
+        # 2. Annual Balance Sheet
         print("\n--- Annual Balance Sheet ---")
-        balance_sheet = nvda.balance_sheet
         if not balance_sheet.empty:
             print("Available years (columns):")
             print([col.strftime('%Y-%m-%d') for col in balance_sheet.columns])
@@ -0,0 +1,84 @@
+"""
+Test the heuristic news sentiment scorer against the original keyword loop.
+
+_heuristic_sentiment_lc must give exactly the scores of the baseline
+`kw in text` loop: plain substring hits (inflected forms like "losses" or
+"downgrades" count), one hit per keyword.
+"""
+
+import sys
+import os
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+from app.tools.news_tools import _heuristic_sentiment_lc
+
+
+def baseline_sentiment(title: str, summary: str) -> tuple[float, str]:
+    """The original per-keyword substring loop, kept verbatim as the reference."""
+    text = f"{title} {summary}".lower()
+    positive = [
+        "beats", "surge", "soar", "record", "upgrade", "strong", "growth", "profit",
+        "bull", "bullish", "rally", "win", "raises", "raises guidance", "acquires",
+    ]
+    negative = [
+        "miss", "slump", "plunge", "drop", "downgrade", "weak", "decline", "loss",
+        "bear", "bearish", "lawsuit", "probe", "investigation", "cut guidance", "cuts guidance",
+    ]
+
+    score = 0
+    for w in positive:
+        if w in text:
+            score += 1
+    for w in negative:
+        if w in text:
+            score -= 1
+
+    score_f = max(-1.0, min(1.0, score / 5.0))
+    if score_f > 0.15:
+        label = "Bullish"
+    elif score_f < -0.15:
+        label = "Bearish"
+    else:
+        label = "Neutral"
+    return score_f, label
+
+
+CORPUS = [
+    ("Company reports losses, shares plunged", ""),
+    ("Stock declines after downgrades", "Analysts cite weak demand"),
+    ("Bullish rally continues", "Record profits and strong growth lift shares"),
+    ("Shares soar as earnings beats estimates", "Company raises guidance for the year"),
+    ("Regulators open probe", "Investigation follows lawsuit; firm cuts guidance"),
+    ("Upgrades pour in", "Surges in demand drive profitable quarter"),
+    ("Bearing maker wins contract", "Window of opportunity for the bear case"),
+    ("Quiet session", "Shares little changed in light volume"),
+    ("Stock drops, misses estimates", "Slumping sales and a weak outlook"),
+    ("Acquires rival in record deal", "Strong\ngrowth expected; cut  guidance withdrawn"),
+    ("", ""),
+]
+
+
+def test_heuristic_sentiment_matches_baseline():
+    for title, summary in CORPUS:
+        expected = baseline_sentiment(title, summary)
+        actual = _heuristic_sentiment_lc(f"{title} {summary}".lower())
+        assert actual == expected, f"{title!r}: expected {expected}, got {actual}"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TESTING HEURISTIC NEWS SENTIMENT")
+    print("=" * 80)
+    mismatches = 0
+    for title, summary in CORPUS:
+        expected = baseline_sentiment(title, summary)
+        actual = _heuristic_sentiment_lc(f"{title} {summary}".lower())
+        ok = actual == expected
+        mismatches += not ok
+        print(f"{'✅' if ok else '❌'} {title[:50]:<50} baseline={expected} new={actual}")
+    print()
+    print("✅ All scores match the baseline" if not mismatches else f"❌ {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
@@ -3,22 +3,36 @@
 
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from app.graph.agent_graph import create_agent_graph
+from app.utils.shared_context import initialize_context
 
-def test_risk_debate(ticker="AAPL", date="2024-03-01"):
+
+def build_graph():
+    # Create graph with risk debate enabled (1 round = 3 exchanges)
+    return create_agent_graph(
+        max_debate_rounds=1,  # Bull/Bear debate
+        max_risk_debate_rounds=1  # Risk debate (aggressive/conservative/neutral)
+    )
+
+
+def test_risk_debate(graph=None, ticker="AAPL", date="2024-03-01"):
     """
     Test the risk debate mechanism on a single ticker.
     This will help verify HOLD rate drops and debate works correctly.
+
+    The compiled graph holds no per-run state, so one graph can be shared
+    across tickers (and threads); a new one is built if none is passed.
     """
     print(f"\n{'='*80}")
     print(f"Testing Risk Debate for {ticker} on {date}")
     print(f"{'='*80}\n")
     
-    # Create graph with risk debate enabled (1 round = 3 exchanges)
-    graph = create_agent_graph(
-        max_debate_rounds=1,  # Bull/Bear debate
-        max_risk_debate_rounds=1  # Risk debate (aggressive/conservative/neutral)
-    )
+    if graph is None:
+        graph = build_graph()
+    
+    # Fresh per-run data context, as the API does before each invoke
+    initialize_context()
     
     # Initialize state
     initial_state = {
@@ -82,22 +96,19 @@ def test_risk_debate(ticker="AAPL", date="2024-03-01"):
             print(f"Total Exchanges: {risk_debate_state.get('count', 0)}")
             print(f"Last Speaker: {risk_debate_state.get('latest_speaker', 'N/A')}")
             
-            # Show abbreviated arguments
-            agg_hist = risk_debate_state.get('aggressive_history', '')
-            cons_hist = risk_debate_state.get('conservative_history', '')
-            neut_hist = risk_debate_state.get('neutral_history', '')
-            
-            if agg_hist:
-                print(f"\nAggressive Analyst (excerpt):")
-                print(f"{agg_hist[:300]}...\n")
-            
-            if cons_hist:
-                print(f"Conservative Analyst (excerpt):")
-                print(f"{cons_hist[:300]}...\n")
-            
-            if neut_hist:
-                print(f"Neutral Analyst (excerpt):")
-                print(f"{neut_hist[:300]}...\n")
+            # Show abbreviated arguments (each history is looked up and sliced once)
+            excerpts = {
+                label: (risk_debate_state.get(key) or '')[:300]
+                for label, key in (
+                    ("Aggressive Analyst", "aggressive_history"),
+                    ("Conservative Analyst", "conservative_history"),
+                    ("Neutral Analyst", "neutral_history"),
+                )
+            }
+            for label, excerpt in excerpts.items():
+                if excerpt:
+                    print(f"\n{label} (excerpt):")
+                    print(f"{excerpt}...\n")
             
             print(f"\nRisk Manager Decision:")
             mgr_decision = risk_report.get('risk_manager_decision', 'N/A')
@@ -127,11 +138,12 @@ if __name__ == "__main__":
         ("NVDA", "2024-03-01"),
     ]
     
-    results = {}
-    for ticker, date in test_tickers:
-        action = test_risk_debate(ticker, date)
-        results[ticker] = action
-        print("\n" + "="*80 + "\n")
+    # Compile once, then run the tickers concurrently (nodes wait on LLM I/O)
+    graph = build_graph()
+    with ThreadPoolExecutor(max_workers=len(test_tickers)) as executor:
+        actions = list(executor.map(lambda td: test_risk_debate(graph, *td), test_tickers))
+    results = {ticker: action for (ticker, _), action in zip(test_tickers, actions)}
+    print("\n" + "="*80 + "\n")
     
     # Summary
     print("\n" + "="*80)
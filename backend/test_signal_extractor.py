@@ -12,7 +12,7 @@ import os
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
 
-from app.agents.execution_core import extract_signal
+from app.agents.execution_core import _regex_signal, extract_signals_batch
 
 
 def test_signal_extractor():
@@ -99,23 +99,25 @@ def test_signal_extractor():
         ),
     ]
     
+    # One LLM call for every case instead of one per case
+    try:
+        extracted_signals = extract_signals_batch([text for text, _, _ in test_cases], "AAPL")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        extracted_signals = [None] * len(test_cases)
+    
     results = []
-    for i, (text, expected, description) in enumerate(test_cases, 1):
+    for i, ((text, expected, description), extracted) in enumerate(zip(test_cases, extracted_signals), 1):
         print(f"Test {i}: {description}")
         print(f"Input text: {text[:100]}{'...' if len(text) > 100 else ''}")
         
-        try:
-            extracted = extract_signal(text, "AAPL")
-            passed = extracted == expected
-            results.append(passed)
-            
-            status = "✅ PASS" if passed else "❌ FAIL"
-            print(f"Expected: {expected}")
-            print(f"Extracted: {extracted}")
-            print(f"Status: {status}")
-        except Exception as e:
-            print(f"❌ ERROR: {e}")
-            results.append(False)
+        passed = extracted == expected
+        results.append(passed)
+        
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"Expected: {expected}")
+        print(f"Extracted: {extracted}")
+        print(f"Status: {status}")
         
         print("-" * 80)
         print()
@@ -140,6 +142,34 @@ def test_signal_extractor():
     return pass_rate >= 80
 
 
+def test_regex_fast_path():
+    """The regex fast path must not read benign exit/reduce wording as SELL."""
+    # (text, expected) - None means "unsure, ask the LLM"
+    cases = [
+        ("Valuation too rich. Consider reducing exposure or exiting positions.", "SELL"),
+        ("Bearish setup; exit the position.", "SELL"),
+        ("Reduce our position and sell into strength.", "SELL"),
+        # Benign phrasings: no SELL hits, so no fast-path answer
+        ("Diversification reduced risk, reducing volatility as the stock is exiting a downtrend.", None),
+        # One real SELL word plus benign phrasings is still under the two-hit bar
+        ("Hedging reduced risk and the trend is bearish.", None),
+        ("Reducing volatility while exiting a downtrend; momentum turned bearish.", None),
+    ]
+
+    print("=" * 80)
+    print("TESTING REGEX SIGNAL FAST PATH")
+    print("=" * 80)
+    failures = 0
+    for text, expected in cases:
+        extracted = _regex_signal(text)
+        ok = extracted == expected
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {text[:60]:<60} expected={expected} got={extracted}")
+    print()
+    assert failures == 0, f"{failures} fast-path cases misclassified"
+
+
 if __name__ == "__main__":
+    test_regex_fast_path()
     success = test_signal_extractor()
     sys.exit(0 if success else 1)
@@ -1,69 +1,94 @@
 """Quick test to verify News, StockTwits, and Twitter integrations.
 
 Run this before full system test to catch API issues early.
+The three checks are independent network calls, so they run concurrently
+(each in a worker thread) and their output is printed in order afterwards.
 """
 
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-print("=" * 80)
-print("TESTING SOCIAL MEDIA & NEWS INTEGRATIONS")
-print("=" * 80)
 
 # Test 1: News (Finnhub)
-print("\n[1/3] Testing Finnhub company news...")
-try:
-    from app.tools.news_tools import search_news
-    
-    articles = search_news("TSLA", limit=5)
-    
-    if articles:
-        print(f"✅ SUCCESS: Retrieved {len(articles)} articles")
-        print(f"   Sample: {articles[0]['title'][:80]}...")
-        print(f"   Tone: {articles[0]['ticker_sentiment_label']} ({articles[0]['ticker_sentiment_score']:.2f})")
-    else:
-        print("⚠️  WARNING: No articles returned (check API key or rate limit)")
-except Exception as e:
-    print(f"❌ FAILED: {e}")
+def check_news() -> list[str]:
+    lines = ["\n[1/3] Testing Finnhub company news..."]
+    try:
+        from app.tools.news_tools import search_news
+
+        articles = search_news("TSLA", limit=5)
+
+        if articles:
+            lines.append(f"✅ SUCCESS: Retrieved {len(articles)} articles")
+            lines.append(f"   Sample: {articles[0]['title'][:80]}...")
+            lines.append(f"   Tone: {articles[0]['ticker_sentiment_label']} ({articles[0]['ticker_sentiment_score']:.2f})")
+        else:
+            lines.append("⚠️  WARNING: No articles returned (check API key or rate limit)")
+    except Exception as e:
+        lines.append(f"❌ FAILED: {e}")
+    return lines
+
 
 # Test 2: StockTwits
-print("\n[2/3] Testing StockTwits API...")
-try:
-    from app.tools.social_media_tools import search_stocktwits, calculate_sentiment_metrics
-    
-    posts = search_stocktwits("TSLA", limit=10)
-    
-    if posts:
-        metrics = calculate_sentiment_metrics(posts)
-        print(f"✅ SUCCESS: Retrieved {len(posts)} posts")
-        print(f"   Bullish: {metrics['bullish_pct']}% | Bearish: {metrics['bearish_pct']}%")
-        print(f"   Sample: [{posts[0]['sentiment'] or 'Neutral'}] {posts[0]['text'][:60]}...")
-    else:
-        print("⚠️  WARNING: No posts returned (check ticker or API)")
-except Exception as e:
-    print(f"❌ FAILED: {e}")
+def check_stocktwits() -> list[str]:
+    lines = ["\n[2/3] Testing StockTwits API..."]
+    try:
+        from app.tools.social_media_tools import search_stocktwits, calculate_sentiment_metrics
+
+        posts = search_stocktwits("TSLA", limit=10)
+
+        if posts:
+            metrics = calculate_sentiment_metrics(posts)
+            lines.append(f"✅ SUCCESS: Retrieved {len(posts)} posts")
+            lines.append(f"   Bullish: {metrics['bullish_pct']}% | Bearish: {metrics['bearish_pct']}%")
+            lines.append(f"   Sample: [{posts[0]['sentiment'] or 'Neutral'}] {posts[0]['text'][:60]}...")
+        else:
+            lines.append("⚠️  WARNING: No posts returned (check ticker or API)")
+    except Exception as e:
+        lines.append(f"❌ FAILED: {e}")
+    return lines
+
 
 # Test 3: Twitter/X Scraping
-print("\n[3/3] Testing Twitter/X scraping (may be slow)...")
-try:
-    from app.tools.social_media_tools import search_twitter
-    
-    tweets = search_twitter("$TSLA", limit=5)
-    
-    if tweets:
-        print(f"✅ SUCCESS: Retrieved {len(tweets)} tweets")
-        print(f"   Sample: {tweets[0]['text'][:60]}...")
-        print(f"   Engagement: {tweets[0]['likes']} likes, {tweets[0]['retweets']} retweets")
-    else:
-        print("⚠️  WARNING: No tweets returned (Nitter may be down)")
-except ImportError:
-    print("⚠️  SKIPPED: ntscraper not installed (run: uv add ntscraper)")
-except Exception as e:
-    print(f"❌ FAILED: {e}")
-    print("   Note: Twitter scraping can be unreliable (Nitter instances may be down)")
+def check_twitter() -> list[str]:
+    lines = ["\n[3/3] Testing Twitter/X scraping (may be slow)..."]
+    try:
+        from app.tools.social_media_tools import search_twitter
+
+        tweets = search_twitter("$TSLA", limit=5)
+
+        if tweets:
+            lines.append(f"✅ SUCCESS: Retrieved {len(tweets)} tweets")
+            lines.append(f"   Sample: {tweets[0]['text'][:60]}...")
+            lines.append(f"   Engagement: {tweets[0]['likes']} likes, {tweets[0]['retweets']} retweets")
+        else:
+            lines.append("⚠️  WARNING: No tweets returned (Nitter may be down)")
+    except ImportError:
+        lines.append("⚠️  SKIPPED: ntscraper not installed (run: uv add ntscraper)")
+    except Exception as e:
+        lines.append(f"❌ FAILED: {e}")
+        lines.append("   Note: Twitter scraping can be unreliable (Nitter instances may be down)")
+    return lines
+
+
+async def run_checks() -> list[list[str]]:
+    # Wall time is the slowest check instead of the sum of all three
+    return await asyncio.gather(
+        asyncio.to_thread(check_news),
+        asyncio.to_thread(check_stocktwits),
+        asyncio.to_thread(check_twitter),
+    )
+
+
+print("=" * 80)
+print("TESTING SOCIAL MEDIA & NEWS INTEGRATIONS")
+print("=" * 80)
+
+for lines in asyncio.run(run_checks()):
+    print("\n".join(lines))
 
 # Summary
 print("\n" + "=" * 80)
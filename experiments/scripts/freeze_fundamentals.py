@@ -10,6 +10,7 @@ Usage:
 Rate Limits (Alpha Vantage free tier):
     - 25 requests/day per key, 5 requests/minute
     - 3 endpoints × 5 tickers = 15 requests (easily done in one run)
+    - Each key gets its own worker and throttle, so K keys fetch ~K× faster
 
 What it fetches for each ticker:
     - INCOME_STATEMENT (annual + quarterly)
@@ -26,15 +27,21 @@ At runtime, filter by fiscalDateEnding <= simulated_date.
 """
 
 import argparse
-import json
 import os
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import product
 from pathlib import Path
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ── Paths ──────────────────────────────────────────────────────────────
 SCRIPT_DIR = Path(__file__).parent
@@ -63,9 +70,25 @@ INTER_CALL_DELAY = 13  # seconds between calls (safe for 5/min rate limit)
 
 # The three fundamental endpoints we care about
 ENDPOINTS = ["INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW"]
+# Cache filenames per endpoint, built once
+ENDPOINT_FILENAMES = {function: function.lower() + ".json" for function in ENDPOINTS}
 
 
-def fetch_av_fundamentals(ticker: str, function: str, api_key: str) -> tuple[dict | None, bool]:
+def make_session() -> requests.Session:
+    """Keep-alive session that retries transient 5xx/connection errors."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    return session
+
+
+# Shared session for callers that don't bring their own (workers each make one)
+_SESSION = make_session()
+
+
+def fetch_av_fundamentals(
+    ticker: str, function: str, api_key: str, session: requests.Session | None = None
+) -> tuple[dict | None, bool]:
     """
     Fetch Alpha Vantage fundamental data for a ticker.
     
@@ -73,6 +96,7 @@ def fetch_av_fundamentals(ticker: str, function: str, api_key: str) -> tuple[dic
         ticker: Stock ticker symbol
         function: One of INCOME_STATEMENT, BALANCE_SHEET, CASH_FLOW
         api_key: Alpha Vantage API key
+        session: Session to use (defaults to the module-level _SESSION)
     
     Returns:
         (data, is_rate_limited): Full response dict or None, and whether key hit rate limit
@@ -84,7 +108,7 @@ def fetch_av_fundamentals(ticker: str, function: str, api_key: str) -> tuple[dic
     }
     
     try:
-        resp = requests.get(AV_BASE_URL, params=params, timeout=30)
+        resp = (session or _SESSION).get(AV_BASE_URL, params=params, timeout=30)
         data = resp.json()
         
         # Rate limited - try next key
@@ -106,13 +130,45 @@ def fetch_av_fundamentals(ticker: str, function: str, api_key: str) -> tuple[dic
 
 def get_cache_path(ticker: str, function: str) -> Path:
     """Get the path for a frozen fundamental file."""
-    filename = function.lower() + ".json"
+    filename = ENDPOINT_FILENAMES.get(function) or function.lower() + ".json"
     return CACHE_DIR / ticker.upper() / filename
 
 
+# (TICKER, FUNCTION) pairs known to be on disk in this run: filled by
+# _scan_existing and save_cache so repeat checks skip the stat()
+_CACHED: set[tuple[str, str]] = set()
+
+
 def is_cached(ticker: str, function: str) -> bool:
     """Check if fundamental data is already frozen for this ticker/function."""
-    return get_cache_path(ticker, function).exists()
+    key = (ticker.upper(), function.upper())
+    if key in _CACHED:
+        return True
+    if get_cache_path(ticker, function).exists():
+        _CACHED.add(key)
+        return True
+    return False
+
+
+def _scan_existing() -> set[tuple[str, str]]:
+    """
+    All frozen (TICKER, FUNCTION) pairs, from one scandir per ticker directory.
+
+    Used to build the work queue without a stat() per ticker/endpoint.
+    """
+    existing = set()
+    if not CACHE_DIR.is_dir():
+        return existing
+    with os.scandir(CACHE_DIR) as ticker_dirs:
+        for ticker_dir in ticker_dirs:
+            if not ticker_dir.is_dir():
+                continue
+            with os.scandir(ticker_dir.path) as files:
+                for entry in files:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        existing.add((ticker_dir.name.upper(), entry.name[:-5].upper()))
+    _CACHED.update(existing)
+    return existing
 
 
 def save_cache(ticker: str, function: str, data: dict):
@@ -129,14 +185,61 @@ def save_cache(ticker: str, function: str, data: dict):
         "data": data,
     }
     
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 directly; keep the indent since these files are
+    # committed and reviewed as diffs. Write-then-rename so an interrupted
+    # run never leaves a truncated file that looks cached.
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
+    _CACHED.add((ticker.upper(), function.upper()))
+
+
+def key_worker(key_num: int, api_key: str, work_queue: "queue.Queue", stats: dict, lock: threading.Lock, total_calls: int):
+    """
+    Drain the shared work queue with one API key, throttled independently.
+
+    A rate-limited key puts its pair back for the other keys and retires.
+    """
+    session = make_session()
+    first_call = True
+    while True:
+        try:
+            i, ticker, function = work_queue.get_nowait()
+        except queue.Empty:
+            return
+        
+        if not first_call:
+            # Per-key throttle between calls
+            time.sleep(INTER_CALL_DELAY)
+        first_call = False
+        
+        data, rate_limited = fetch_av_fundamentals(ticker, function, api_key, session=session)
+        
+        if rate_limited:
+            work_queue.put((i, ticker, function))
+            with lock:
+                print(f"⏳ Key {key_num} rate limited, retiring it ({ticker} {function} requeued)")
+            return
+        
+        if data is None:
+            with lock:
+                print(f"[{i}/{total_calls}] {ticker:6s} {function}... ❌ Failed")
+                stats["failed"] += 1
+            continue
+        
+        save_cache(ticker, function, data)
+        annual_count = len(data.get("annualReports", []))
+        quarterly_count = len(data.get("quarterlyReports", []))
+        with lock:
+            print(f"[{i}/{total_calls}] {ticker:6s} {function}... ✅ {annual_count} annual, {quarterly_count} quarterly (key {key_num})")
+            stats["fetched"] += 1
 
 
 def load_tickers(tickers_file: Path) -> list[str]:
     """Load tickers from a text file (one per line)."""
-    with open(tickers_file, "r") as f:
-        return [line.strip().upper() for line in f if line.strip()]
+    # One read and one C-level upper()/split over the whole file
+    lines = tickers_file.read_bytes().upper().splitlines()
+    return [ticker.decode() for ticker in map(bytes.strip, lines) if ticker]
 
 
 def main():
@@ -161,14 +264,13 @@ def main():
         sys.exit(1)
     
     # Build work queue (ticker, function) pairs
-    work = []
-    for ticker in tickers:
-        for function in ENDPOINTS:
-            if not is_cached(ticker, function):
-                work.append((ticker, function))
+    existing = _scan_existing()
+    work = [pair for pair in product(tickers, ENDPOINTS) if pair not in existing]
     
     cached_count = len(tickers) * len(ENDPOINTS) - len(work)
     total_calls = len(work)
+    # Keys fetch in parallel, each throttled on its own
+    estimated_minutes = -(-total_calls // len(AV_KEYS)) * INTER_CALL_DELAY / 60
     
     # Print summary
     print("=" * 60)
@@ -180,7 +282,7 @@ def main():
     print(f"  Total pairs:     {len(tickers) * len(ENDPOINTS)}")
     print(f"  Already cached:  {cached_count}")
     print(f"  To fetch:        {total_calls}")
-    print(f"  Estimated time:  {total_calls * INTER_CALL_DELAY / 60:.1f} minutes")
+    print(f"  Estimated time:  {estimated_minutes:.1f} minutes")
     print("=" * 60)
     
     if total_calls == 0:
@@ -197,7 +299,7 @@ def main():
     
     # Confirm before proceeding
     if not args.dry_run:
-        print(f"\n⚠️  About to make {total_calls} API calls (~{total_calls * INTER_CALL_DELAY / 60:.1f} min)")
+        print(f"\n⚠️  About to make {total_calls} API calls (~{estimated_minutes:.1f} min)")
         response = input("Continue? [y/N]: ")
         if response.lower() != 'y':
             print("Aborted.")
@@ -207,42 +309,25 @@ def main():
     print("\n🚀 Starting fetch...")
     print("=" * 60)
     
-    key_idx = 0
-    success_count = 0
-    skip_count = 0
-    
+    work_queue: "queue.Queue" = queue.Queue()
     for i, (ticker, function) in enumerate(work, 1):
-        print(f"[{i}/{total_calls}] {ticker:6s} {function}...", end=" ", flush=True)
-        
-        # Try each key until one works
-        fetched = False
-        for attempt in range(len(AV_KEYS)):
-            api_key = AV_KEYS[key_idx]
-            data, rate_limited = fetch_av_fundamentals(ticker, function, api_key)
-            
-            if rate_limited:
-                print(f"⏳ Key {key_idx + 1} rate limited, trying next...", end=" ", flush=True)
-                key_idx = (key_idx + 1) % len(AV_KEYS)
-                continue
-            
-            if data is None:
-                print("❌ Failed")
-                skip_count += 1
-                fetched = False
-                break
-            
-            # Success
-            save_cache(ticker, function, data)
-            annual_count = len(data.get("annualReports", []))
-            quarterly_count = len(data.get("quarterlyReports", []))
-            print(f"✅ {annual_count} annual, {quarterly_count} quarterly")
-            success_count += 1
-            fetched = True
-            break
-        
-        if fetched and i < total_calls:
-            # Sleep between calls (except after last one)
-            time.sleep(INTER_CALL_DELAY)
+        work_queue.put((i, ticker, function))
+    
+    stats = {"fetched": 0, "failed": 0}
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(AV_KEYS)) as executor:
+        futures = [
+            executor.submit(key_worker, key_num, api_key, work_queue, stats, lock, total_calls)
+            for key_num, api_key in enumerate(AV_KEYS, 1)
+        ]
+        for future in futures:
+            future.result()
+    
+    success_count = stats["fetched"]
+    skip_count = stats["failed"]
+    remaining = work_queue.qsize()
+    if remaining:
+        print(f"⚠️  {remaining} pairs not fetched (all keys rate limited) - rerun later")
     
     # Summary
     print("=" * 60)
@@ -12,25 +12,34 @@ Rate Limits (Alpha Vantage free tier):
     - 25 requests/day per key, 5 requests/minute
     - With 2 keys: ~50 requests/day
     - 5 tickers × 76 dates = 380 fetches → ~8 days
+    - Each key gets its own worker and 13s throttle, so keys fetch in parallel
 
-The script is RESUMABLE: it skips any (ticker, date) that already has a frozen file.
+The script is RESUMABLE: it skips any (ticker, date) that already has a frozen record.
 Run it daily until complete — it picks up where it left off.
 
 Output:
-    experiments/cache/news/{ticker}/{date}.json
-    Each file contains the Alpha Vantage NEWS_SENTIMENT response (list of articles).
+    experiments/cache/news/{ticker}.jsonl
+    One line per fetched (ticker, date): the Alpha Vantage NEWS_SENTIMENT
+    response (list of articles) plus its date. Older runs wrote
+    experiments/cache/news/{ticker}/{date}.json; those files are still read
+    and count as frozen.
 """
 
 import argparse
-import json
 import os
+import random
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # ── Paths ──────────────────────────────────────────────────────────────
 SCRIPT_DIR = Path(__file__).parent
@@ -58,31 +67,82 @@ AV_BASE_URL = "https://www.alphavantage.co/query"
 LOOKBACK_DAYS = 14
 CALLS_PER_DAY_PER_KEY = 25
 INTER_CALL_DELAY = 13  # seconds between calls (safe for 5/min rate limit)
+MAX_ATTEMPTS = 5  # per call, for timeouts / connection errors / 429 / 5xx
+BACKOFF_BASE = 0.5  # seconds; doubles each retry (0.5, 1, 2, 4) plus jitter
 
+# Request params shared by every NEWS_SENTIMENT call
+BASE_PARAMS = {"function": "NEWS_SENTIMENT", "limit": 50, "sort": "RELEVANCE"}
 
-def fetch_av_news(ticker: str, date_str: str, api_key: str) -> tuple[list[dict], bool]:
+# One keep-alive session for every call, so only the first pays the TLS handshake
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=max(len(AV_KEYS), 1), max_retries=0))
+
+
+def _safe_float(value, default: float = 0.0) -> float:
+    """Coerce an AV numeric string to float, falling back to default on None/garbage."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    """Retry-After header in seconds, if the server sent a numeric one."""
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _get_with_backoff(params: dict) -> requests.Response:
+    """
+    GET with exponential backoff + jitter on transient failures.
+
+    Retries timeouts, connection errors, 429 and 5xx up to MAX_ATTEMPTS times,
+    honoring Retry-After when present. Raises the last error if all fail.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        delay = BACKOFF_BASE * (2 ** attempt) + random.random() * 0.5
+        try:
+            resp = SESSION.get(AV_BASE_URL, params=params, timeout=30)
+        except (requests.Timeout, requests.ConnectionError):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(delay)
+            continue
+        if resp.status_code == 429 or resp.status_code >= 500:
+            if attempt == MAX_ATTEMPTS - 1:
+                resp.raise_for_status()
+            time.sleep(_retry_after_seconds(resp) or delay)
+            continue
+        return resp
+    raise RuntimeError("unreachable")
+
+
+def fetch_av_news(ticker: str, date_str: str, api_key: str) -> tuple[list[dict] | None, bool]:
     """
     Fetch Alpha Vantage NEWS_SENTIMENT for a ticker.
     
     Returns:
-        (articles, is_rate_limited): list of articles and whether the key hit rate limit
+        (articles, is_rate_limited): list of articles and whether the key hit rate limit.
+        articles is None when the request kept failing after retries, so the
+        pair is left unfrozen for the next run instead of saved as empty.
     """
     end_dt = datetime.fromisoformat(date_str)
     start_dt = end_dt - timedelta(days=LOOKBACK_DAYS)
     
     params = {
-        "function": "NEWS_SENTIMENT",
+        **BASE_PARAMS,
         "tickers": ticker,
         "time_from": start_dt.strftime("%Y%m%dT0000"),
         "time_to": end_dt.strftime("%Y%m%dT2359"),
-        "limit": 50,
-        "sort": "RELEVANCE",
         "apikey": api_key,
     }
     
     try:
-        resp = requests.get(AV_BASE_URL, params=params, timeout=30)
-        data = resp.json()
+        resp = _get_with_backoff(params)
+        # orjson parses the raw bytes directly, skipping the str decode
+        data = orjson.loads(resp.content)
         
         # Rate limited - try next key
         if "Note" in data or "Information" in data:
@@ -93,13 +153,14 @@ def fetch_av_news(ticker: str, date_str: str, api_key: str) -> tuple[list[dict],
             return [], False
         
         # Success - convert to our schema
+        ticker_upper = ticker.upper()
         articles = []
         for item in data.get("feed", []):
-            ticker_sentiment = next(
-                (ts for ts in item.get("ticker_sentiment", []) 
-                 if ts.get("ticker", "").upper() == ticker.upper()),
-                {}
-            )
+            ticker_sentiment = {}
+            for ts in item.get("ticker_sentiment", ()):
+                if ts.get("ticker", "").upper() == ticker_upper:
+                    ticker_sentiment = ts
+                    break
             
             articles.append({
                 "title": item.get("title", ""),
@@ -107,45 +168,184 @@ def fetch_av_news(ticker: str, date_str: str, api_key: str) -> tuple[list[dict],
                 "url": item.get("url", ""),
                 "source": item.get("source", "Unknown"),
                 "published": item.get("time_published", ""),
-                "overall_sentiment_score": float(item.get("overall_sentiment_score", 0)),
+                "overall_sentiment_score": _safe_float(item.get("overall_sentiment_score")),
                 "overall_sentiment_label": item.get("overall_sentiment_label", "Neutral"),
-                "ticker_sentiment_score": float(ticker_sentiment.get("ticker_sentiment_score", 0)),
+                "ticker_sentiment_score": _safe_float(ticker_sentiment.get("ticker_sentiment_score")),
                 "ticker_sentiment_label": ticker_sentiment.get("ticker_sentiment_label", "Neutral"),
-                "relevance_score": float(ticker_sentiment.get("relevance_score", 0)),
+                "relevance_score": _safe_float(ticker_sentiment.get("relevance_score")),
             })
         
         return articles, False
     
     except Exception as e:
+        # Errors that outlived the retries, or an unparseable body
         print(f"Error: {e}")
-        return [], False
+        return None, False
 
 
-def get_cache_path(ticker: str, date_str: str) -> Path:
-    """Get the path for a frozen news file."""
+def get_cache_path(ticker: str) -> Path:
+    """Get the per-ticker JSONL file that frozen news for a ticker is appended to."""
+    return CACHE_DIR / f"{ticker.upper()}.jsonl"
+
+
+def get_legacy_cache_path(ticker: str, date_str: str) -> Path:
+    """Path of a frozen news file in the older one-file-per-date layout."""
     return CACHE_DIR / ticker.upper() / f"{date_str}.json"
 
 
+# Dates already frozen per ticker, loaded from disk once and kept current by save_cache
+_CACHED_DATES: dict[str, set[str]] = {}
+_SAVE_LOCK = threading.Lock()
+
+
+def _scan_cached_dates(ticker: str) -> set[str]:
+    """Dates frozen for a ticker, from its JSONL plus any legacy per-date files."""
+    dates = set()
+    path = get_cache_path(ticker)
+    if path.is_file():
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    dates.add(orjson.loads(line)["date"])
+    ticker_dir = CACHE_DIR / ticker.upper()
+    if ticker_dir.is_dir():
+        with os.scandir(ticker_dir) as entries:
+            dates.update(
+                entry.name[:-5] for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+    return dates
+
+
+def _cached_dates(ticker: str) -> set[str]:
+    """Dates already frozen for a ticker (scanned once per ticker per run)."""
+    ticker = ticker.upper()
+    if ticker not in _CACHED_DATES:
+        _CACHED_DATES[ticker] = _scan_cached_dates(ticker)
+    return _CACHED_DATES[ticker]
+
+
 def is_cached(ticker: str, date_str: str) -> bool:
     """Check if news is already frozen for this ticker/date."""
-    return get_cache_path(ticker, date_str).exists()
+    return date_str in _cached_dates(ticker)
 
 
 def save_cache(ticker: str, date_str: str, articles: list[dict]):
-    """Save fetched articles to disk."""
-    path = get_cache_path(ticker, date_str)
+    """Append fetched articles to the ticker's JSONL as one record."""
+    path = get_cache_path(ticker)
     path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "ticker": ticker,
-            "date": date_str,
-            "lookback_days": LOOKBACK_DAYS,
-            "fetched_at": datetime.now().isoformat(),
-            "source": "alpha_vantage",
-            "article_count": len(articles),
-            "articles": articles,
-        }, f, indent=2, ensure_ascii=False)
+    payload = {
+        "ticker": ticker,
+        "date": date_str,
+        "lookback_days": LOOKBACK_DAYS,
+        "fetched_at": datetime.now().isoformat(),
+        "source": "alpha_vantage",
+        "article_count": len(articles),
+        "articles": articles,
+    }
+    line = orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    # Key workers save concurrently; one lock keeps each line whole
+    with _SAVE_LOCK:
+        with open(path, "ab") as f:
+            f.write(line)
+        _cached_dates(ticker).add(date_str)
+
+
+class FetchRun:
+    """
+    Shared state for the per-key fetch workers.
+
+    Each pending item is [ticker, date_str, tried_keys, got_valid_response].
+    An item whose key returned 0 articles goes back on the queue for a key that
+    hasn't tried it yet; once every live key has tried it, the empty result is
+    saved (as the sequential loop did). A rate-limited key retires.
+    """
+
+    def __init__(self, work: list[tuple[str, str]], keys: list[str], max_calls: int):
+        self.pending = deque([ticker, date_str, set(), False] for ticker, date_str in work)
+        self.live_keys = set(keys)
+        self.max_calls = max_calls
+        self.started = 0  # items taken for the first time (the per-run budget)
+        self.in_flight = 0
+        self.success = 0
+        self.cond = threading.Condition()
+
+    def take(self, api_key: str):
+        """Next item this key hasn't tried, or None when there's nothing left for it."""
+        with self.cond:
+            while True:
+                if api_key not in self.live_keys:
+                    return None
+                for item in self.pending:
+                    first_attempt = not item[2]
+                    if api_key in item[2] or (first_attempt and self.started >= self.max_calls):
+                        continue
+                    self.pending.remove(item)
+                    self.started += first_attempt
+                    self.in_flight += 1
+                    return item
+                if not self.in_flight:
+                    return None
+                # Another worker may requeue an item this key can take
+                self.cond.wait()
+
+    def finish(self, item, articles: list[dict] | None, api_key: str, label: str):
+        """Record one attempt's outcome (articles=None means rate limited)."""
+        ticker, date_str, tried, got_valid = item
+        with self.cond:
+            self.in_flight -= 1
+            if articles is None:
+                print(f"  {label} ⏸️  rate limited, retiring key")
+                self.live_keys.discard(api_key)
+                self.pending.appendleft(item)
+                self._save_exhausted()
+            elif articles or not (self.live_keys - tried - {api_key}):
+                save_cache(ticker, date_str, articles)
+                self.success += 1
+                print(f"  {label} ✅ {len(articles)} articles")
+            else:
+                tried.add(api_key)
+                item[3] = True
+                self.pending.appendleft(item)
+                print(f"  {label} -> 0 articles, trying next key...")
+            self.cond.notify_all()
+
+    def fail(self, item, label: str):
+        """Drop an item whose request kept failing; it stays unfrozen for the next run."""
+        with self.cond:
+            self.in_flight -= 1
+            print(f"  {label} ❌ request failed after {MAX_ATTEMPTS} attempts, leaving for next run")
+            self.cond.notify_all()
+
+    def _save_exhausted(self):
+        """Save empty results for items every remaining live key has already tried."""
+        for item in list(self.pending):
+            ticker, date_str, tried, got_valid = item
+            if got_valid and not (self.live_keys - tried):
+                self.pending.remove(item)
+                save_cache(ticker, date_str, [])
+                self.success += 1
+                print(f"  {ticker}/{date_str} ✅ 0 articles (all {len(tried)} valid keys returned 0)")
+
+
+def key_worker(run: FetchRun, key_num: int, api_key: str):
+    """Fetch items with one API key, spacing its own calls INTER_CALL_DELAY apart."""
+    last_call = 0.0
+    while True:
+        item = run.take(api_key)
+        if item is None:
+            return
+        wait = INTER_CALL_DELAY - (time.monotonic() - last_call)
+        if wait > 0:
+            time.sleep(wait)
+        last_call = time.monotonic()
+        articles, is_rate_limited = fetch_av_news(item[0], item[1], api_key)
+        label = f"{item[0]}/{item[1]} (key {key_num})"
+        if articles is None and not is_rate_limited:
+            run.fail(item, label)
+        else:
+            run.finish(item, None if is_rate_limited else articles, api_key, label)
 
 
 def load_dates(dates_file: Path) -> list[str]:
@@ -183,12 +383,16 @@ def main():
         print("❌ No Alpha Vantage API keys found in .env")
         sys.exit(1)
     
-    # Build work queue
-    work = []
-    for ticker in tickers:
-        for date_str in dates:
-            if not is_cached(ticker, date_str):
-                work.append((ticker, date_str))
+    # Build work queue (one scan per ticker instead of a stat per pair).
+    # Date-major order round-robins the tickers, so a partial run's quota
+    # covers every ticker evenly instead of finishing one ticker first.
+    cached_by_ticker = {ticker: _cached_dates(ticker) for ticker in tickers}
+    work = [
+        (ticker, date_str)
+        for date_str in dates
+        for ticker in tickers
+        if date_str not in cached_by_ticker[ticker]
+    ]
     
     cached = len(tickers) * len(dates) - len(work)
     max_calls = args.max_calls or (CALLS_PER_DAY_PER_KEY * len(AV_KEYS))
@@ -216,73 +420,19 @@ def main():
         return
     
     # Fetch loop
-    print(f"\n🚀 Fetching (13s delay between calls)...\n")
+    print(f"\n🚀 Fetching with {len(AV_KEYS)} keys in parallel (13s delay between calls per key)...\n")
     
-    rate_limited_keys = set()
-    calls_made = 0
-    success = 0
-    
-    for ticker, date_str in work:
-        if calls_made >= max_calls:
-            break
-
-        # Try keys until one provides articles, or all are exhausted
-        final_articles = None
-        any_valid_response = False
-        tried_keys_count = 0
-        newly_rate_limited_count = 0
-
-        for key_idx, api_key in enumerate(AV_KEYS):
-            if api_key in rate_limited_keys:
-                continue
-
-            tried_keys_count += 1
-            # Use the same call count for retries on the same work item for display
-            print(f"  [{calls_made + 1}] {ticker}/{date_str} (key {key_idx + 1})...", end=" ")
-            articles, is_rate_limited = fetch_av_news(ticker, date_str, api_key)
-
-            if is_rate_limited:
-                print("⏸️  rate limited")
-                rate_limited_keys.add(api_key)
-                newly_rate_limited_count += 1
-                continue
-
-            # Got a valid response that isn't a rate-limit error
-            any_valid_response = True
-            final_articles = articles
-
-            if articles:  # Non-empty list, we are done with this item
-                break
-            else:  # Empty list, try the next key
-                print("-> 0 articles, trying next key...")
-
-        # After trying all keys for a ticker/date, decide what to do
-        if any_valid_response:
-            save_cache(ticker, date_str, final_articles)
-            if final_articles:
-                print(f"✅ {len(final_articles)} articles")
-            else:
-                # This line is reached if all valid keys returned 0 articles
-                valid_key_attempts = tried_keys_count - newly_rate_limited_count
-                summary = f"all {valid_key_attempts} valid keys returned 0"
-                if newly_rate_limited_count > 0:
-                    summary += f"; {newly_rate_limited_count} keys hit rate-limit"
-                print(f"✅ 0 articles ({summary})")
-
-            calls_made += 1
-            success += 1
-
-            # Delay before next call
-            if calls_made < max_calls and calls_made < len(work):
-                time.sleep(INTER_CALL_DELAY)
-        else:
-            # All keys were either in rate_limited_keys or became rate-limited
-            summary = f"{newly_rate_limited_count} newly rate-limited"
-            if tried_keys_count == newly_rate_limited_count and tried_keys_count > 0:
-                summary = f"all {tried_keys_count} tried keys were rate-limited"
-            
-            print(f"  ❌ All keys exhausted for {ticker}/{date_str} ({summary})")
-            break
+    run = FetchRun(work, AV_KEYS, max_calls)
+    with ThreadPoolExecutor(max_workers=len(AV_KEYS)) as executor:
+        futures = [
+            executor.submit(key_worker, run, key_num, api_key)
+            for key_num, api_key in enumerate(AV_KEYS, 1)
+        ]
+        for future in futures:
+            future.result()
+    success = run.success
+    if not run.live_keys:
+        print(f"  ❌ All keys exhausted ({len(AV_KEYS)} rate-limited)")
     
     # Summary
     remaining = len(work) - success
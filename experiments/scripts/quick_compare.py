@@ -10,15 +10,15 @@ Usage:
 import sys
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 
+BASELINES = ['buy_hold', 'sma', 'rsi', 'random']
+
+
 def run_nexustrader(ticker: str, simulated_date: str, backend_url: str = "http://localhost:8000"):
-    """Run NexusTrader analysis."""
-    print(f"\n{'='*80}")
-    print(f"NEXUSTRADER (Agentic)")
-    print('='*80)
-    
+    """Run NexusTrader analysis. Returns (result, error)."""
     url = f"{backend_url}/analyze"
     payload = {
         "ticker": ticker,
@@ -32,29 +32,13 @@ def run_nexustrader(ticker: str, simulated_date: str, backend_url: str = "http:/
     try:
         response = requests.post(url, json=payload, timeout=300)
         response.raise_for_status()
-        result = response.json()
-        
-        ts = result.get('trading_strategy', {})
-        print(f"Action: {ts.get('action', 'N/A')}")
-        print(f"Entry: {ts.get('entry_price', 'N/A')}")
-        print(f"Take Profit: {ts.get('take_profit', 'N/A')}")
-        print(f"Stop Loss: {ts.get('stop_loss', 'N/A')}")
-        print(f"Position %: {ts.get('position_size_pct', 'N/A')}")
-        print(f"Rationale: {ts.get('rationale', 'N/A')[:150]}...")
-        
-        return result
-        
+        return response.json(), None
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        return None
+        return None, e
 
 
 def run_baseline(ticker: str, simulated_date: str, baseline_name: str, backend_url: str = "http://localhost:8000"):
-    """Run a baseline strategy."""
-    print(f"\n{'='*80}")
-    print(f"{baseline_name.upper().replace('_', ' ')} (Baseline)")
-    print('='*80)
-    
+    """Run a baseline strategy. Returns (result, error)."""
     url = f"{backend_url}/baseline"
     payload = {
         "ticker": ticker,
@@ -65,21 +49,32 @@ def run_baseline(ticker: str, simulated_date: str, baseline_name: str, backend_u
     try:
         response = requests.post(url, json=payload, timeout=30)
         response.raise_for_status()
-        result = response.json()
-        
-        ts = result.get('trading_strategy', {})
-        print(f"Action: {ts.get('action', 'N/A')}")
-        print(f"Entry: {ts.get('entry_price', 'N/A')}")
-        print(f"Take Profit: {ts.get('take_profit', 'N/A')}")
-        print(f"Stop Loss: {ts.get('stop_loss', 'N/A')}")
-        print(f"Position %: {ts.get('position_size_pct', 'N/A')}")
-        print(f"Rationale: {ts.get('rationale', 'N/A')}")
-        
-        return result
-        
+        return response.json(), None
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        return None
+        return None, e
+
+
+def print_strategy(title: str, result, error, rationale_chars: int | None = None):
+    """Print one strategy's trading plan (or its error) as a section."""
+    print(f"\n{'='*80}")
+    print(title)
+    print('='*80)
+    
+    if error is not None:
+        print(f"❌ Error: {str(error)}")
+        return
+    
+    ts = result.get('trading_strategy', {})
+    rationale = ts.get('rationale', 'N/A')
+    print(f"Action: {ts.get('action', 'N/A')}")
+    print(f"Entry: {ts.get('entry_price', 'N/A')}")
+    print(f"Take Profit: {ts.get('take_profit', 'N/A')}")
+    print(f"Stop Loss: {ts.get('stop_loss', 'N/A')}")
+    print(f"Position %: {ts.get('position_size_pct', 'N/A')}")
+    if rationale_chars is None:
+        print(f"Rationale: {rationale}")
+    else:
+        print(f"Rationale: {rationale[:rationale_chars]}...")
 
 
 def main():
@@ -94,14 +89,26 @@ def main():
     print(f"\n🔬 Quick Comparison: {ticker} as of {simulated_date}")
     print(f"{'='*80}\n")
     
-    results = {}
-    
-    # Run NexusTrader (agentic)
-    results['nexustrader'] = run_nexustrader(ticker, simulated_date)
-    
-    # Run all baselines
-    for baseline in ['buy_hold', 'sma', 'rsi', 'random']:
-        results[baseline] = run_baseline(ticker, simulated_date, baseline)
+    # The five requests are independent: run them concurrently, then print in order
+    with ThreadPoolExecutor(max_workers=1 + len(BASELINES)) as executor:
+        agentic_future = executor.submit(run_nexustrader, ticker, simulated_date)
+        baseline_futures = {
+            baseline: executor.submit(run_baseline, ticker, simulated_date, baseline)
+            for baseline in BASELINES
+        }
+        
+        results = {}
+        
+        # NexusTrader (agentic)
+        result, error = agentic_future.result()
+        print_strategy("NEXUSTRADER (Agentic)", result, error, rationale_chars=150)
+        results['nexustrader'] = result
+        
+        # All baselines
+        for baseline, future in baseline_futures.items():
+            result, error = future.result()
+            print_strategy(f"{baseline.upper().replace('_', ' ')} (Baseline)", result, error)
+            results[baseline] = result
     
     # Summary table
     print(f"\n{'='*80}")
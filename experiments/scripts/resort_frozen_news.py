@@ -1,35 +1,86 @@
 #!/usr/bin/env python3
 """
-Re-sort all frozen news JSON files by relevance_score (descending).
+Re-sort all frozen news by relevance_score (descending).
 This ensures agents see the most relevant articles first.
+Files that are already sorted are left untouched.
+
+Handles both layouts: per-ticker {ticker}.jsonl files (rewritten atomically,
+one line per date) and legacy {ticker}/{date}.json files.
 """
 
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orjson
+
 CACHE_DIR = Path(__file__).parent.parent / "cache" / "news"
 
+def _relevance(article: dict) -> float:
+    return float(article.get("relevance_score", 0))
+
+
+def _sort_articles(articles: list[dict]) -> list[dict]:
+    """Sort by relevance_score descending."""
+    return sorted(articles, key=_relevance, reverse=True)
+
+
+def _is_sorted(articles: list[dict]) -> bool:
+    """True if articles are already in non-ascending relevance order."""
+    scores = [_relevance(a) for a in articles]
+    return all(a >= b for a, b in zip(scores, scores[1:]))
+
+
+def resort_jsonl(jsonl_path: Path):
+    """Sort each record's articles, drop superseded dates, and rewrite the JSONL atomically."""
+    by_date = {}
+    line_count = 0
+    for line in jsonl_path.read_bytes().splitlines():
+        if line.strip():
+            record = orjson.loads(line)
+            line_count += 1
+            # A date frozen twice keeps its latest record
+            by_date[record["date"]] = record
+    
+    # Skip the rewrite when dates are unique, in order, and every record is sorted
+    dates = list(by_date)
+    if (
+        line_count == len(dates)
+        and dates == sorted(dates)
+        and all(_is_sorted(record.get("articles", [])) for record in by_date.values())
+    ):
+        return 0, 0
+    
+    total_articles = 0
+    out = bytearray()
+    for date_str in sorted(by_date):
+        record = by_date[date_str]
+        articles = record.get("articles", [])
+        record["articles"] = _sort_articles(articles)
+        total_articles += len(articles)
+        out += orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    
+    tmp_path = jsonl_path.with_suffix(".jsonl.tmp")
+    tmp_path.write_bytes(out)
+    os.replace(tmp_path, jsonl_path)
+    return len(by_date), total_articles
+
+
 def resort_file(json_path: Path):
     """Sort articles by relevance_score (descending) and rewrite file."""
     try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if json_path.suffix == ".jsonl":
+            return resort_jsonl(json_path)
+        
+        data = orjson.loads(json_path.read_bytes())
         
         articles = data.get("articles", [])
-        if not articles:
+        if _is_sorted(articles):
             return 0, 0
         
-        # Sort by relevance_score descending
-        articles_sorted = sorted(
-            articles,
-            key=lambda a: float(a.get("relevance_score", 0)),
-            reverse=True
-        )
+        data["articles"] = _sort_articles(articles)
         
-        data["articles"] = articles_sorted
-        
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        json_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         return 1, len(articles)
     
@@ -43,32 +94,38 @@ def main():
         print(f"❌ Cache directory not found: {CACHE_DIR}")
         return
     
-    json_files = list(CACHE_DIR.glob("*/*.json"))
+    json_files = list(CACHE_DIR.glob("*.jsonl")) + list(CACHE_DIR.glob("*/*.json"))
     
     print("=" * 60)
     print("  RE-SORTING FROZEN NEWS BY RELEVANCE")
     print("=" * 60)
-    print(f"  Found: {len(json_files)} JSON files\n")
+    print(f"  Found: {len(json_files)} news files\n")
     
     if not json_files:
-        print("❌ No JSON files found!")
+        print("❌ No news files found!")
         return
     
     total_files = 0
     total_articles = 0
     
-    for json_path in json_files:
-        files, articles = resort_file(json_path)
+    # Files are independent and parse/sort/serialize is CPU-bound: use every core
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(resort_file, json_files, chunksize=16))
+    
+    skipped = results.count((0, 0))
+    for json_path, (files, articles) in zip(json_files, results):
         if files:
             total_files += files
             total_articles += articles
-            ticker = json_path.parent.name
-            date = json_path.stem
-            print(f"  ✅ {ticker}/{date} — {articles} articles sorted")
+            if json_path.suffix == ".jsonl":
+                print(f"  ✅ {json_path.stem} — {files} dates, {articles} articles sorted")
+            else:
+                print(f"  ✅ {json_path.parent.name}/{json_path.stem} — {articles} articles sorted")
     
     print(f"\n{'=' * 60}")
     print(f"  COMPLETE")
-    print(f"  Files sorted:    {total_files}")
+    print(f"  Dates sorted:    {total_files}")
+    print(f"  Unchanged:       {skipped}")
     print(f"  Total articles:  {total_articles}")
     print(f"{'=' * 60}")
 
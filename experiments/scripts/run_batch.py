@@ -1,12 +1,19 @@
 import argparse
-import json
+import hashlib
 import os
+import queue
+import random
+import sqlite3
 import sys
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict, Any, Literal, Tuple
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,7 +22,23 @@ DEFAULT_TICKERS_FILE = os.path.join(EXPERIMENTS_DIR, "inputs", "tickers.txt")
 DEFAULT_DATES_FILE = os.path.join(EXPERIMENTS_DIR, "inputs", "dates_expanded.txt")
 DEFAULT_OUT_DIR = os.path.join(EXPERIMENTS_DIR, "results", "raw")
 DEFAULT_TRACE_OUT_DIR = os.path.join(EXPERIMENTS_DIR, "results", "traces")
+DEFAULT_RESPONSE_CACHE = os.path.join(EXPERIMENTS_DIR, "cache", "analyze_cache.sqlite")
 SCHEMA_VERSION = "2.0"
+BACKOFF_BASE = 0.5  # seconds before the first retry; doubles per attempt, plus jitter
+BACKOFF_MAX = 30.0
+
+# Keep-alive session shared by all workers (pool sized in run_batch).
+# Bodies are serialized with orjson, so the JSON content type is set once here.
+SESSION = requests.Session()
+SESSION.headers["Content-Type"] = "application/json"
+
+
+def _configure_session(workers: int) -> None:
+    """Size the connection pool so every worker can hold a keep-alive connection."""
+    workers = max(1, workers)
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers * 2)
+    SESSION.mount("http://", adapter)
+    SESSION.mount("https://", adapter)
 
 STAGE_PRESETS = {
     "A": {"debate_mode": "off", "debate_rounds": 0, "risk_debate_rounds": 0, "risk_mode": "off", "memory_on": False},
@@ -123,6 +146,144 @@ def load_pairs_from_file(path: str) -> List[Tuple[str, str]]:
     return pairs
 
 
+def load_completed_jobs(jsonl_path: str) -> set[Tuple[str, str, str]]:
+    """(ticker, simulated_date, horizon) of every successful record in a previous batch JSONL."""
+    done = set()
+    with open(jsonl_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = orjson.loads(line)
+            if "error" not in row:
+                done.add((row["ticker"], row["simulated_date"], row["horizon"]))
+    return done
+
+
+class JsonlWriter:
+    """
+    Append records to a JSONL file from a single background writer thread.
+
+    Producers only serialize and enqueue; the writer flushes when it drains the
+    queue, so a burst of finished jobs costs one flush instead of one each.
+    With path=None records are discarded; append=True adds to an existing file.
+    """
+
+    _OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+    def __init__(self, path: str | None, append: bool = False):
+        self._file = open(path, "ab" if append else "wb") if path else None
+        self._queue: "queue.Queue[bytes | None]" = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._file is not None:
+            self._queue.put(orjson.dumps(record, option=self._OPTIONS))
+
+    def _drain(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                break
+            self._file.write(line)
+            if self._queue.empty():
+                self._file.flush()
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ResponseCache:
+    """
+    SQLite cache of successful /analyze responses keyed by the request payload.
+
+    Reruns of the same (ticker, date, horizon, flags) job are served from disk
+    instead of re-running the whole agent pipeline. Opt-in (--response-cache):
+    LLM output is not deterministic and cached runs skip backend side effects
+    such as memory stores, so it is meant for iterating on scoring/plumbing.
+    """
+
+    def __init__(self, path: str, refresh: bool = False):
+        ensure_dir(os.path.dirname(path))
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(payload: Dict[str, Any]) -> str:
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def get(self, payload: Dict[str, Any]) -> Dict[str, Any] | None:
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ?", (self.key(payload),)
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, payload: Dict[str, Any], result: Dict[str, Any]) -> None:
+        body = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, ts) VALUES (?, ?, ?)",
+                (self.key(payload), body, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimiter:
+    """
+    Space /analyze calls at most `rps` per second across all worker threads.
+
+    Each acquire() reserves the next free slot and sleeps until it, so bursts
+    from many workers are smoothed to the backend's (LLM provider's) limit.
+    """
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After on a 429, else exponential backoff + jitter."""
+    response = getattr(exc, "response", None)
+    if response is not None and response.status_code == 429:
+        try:
+            return min(float(response.headers["Retry-After"]), BACKOFF_MAX)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_MAX) + random.random() * BACKOFF_BASE
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -144,26 +305,31 @@ def _truncate_text(value: Any, max_chars: int) -> Any:
     return value
 
 
+def _compact_section(section: Any, truncate_chars: int) -> Dict[str, Any]:
+    """Section dict with a truncated rationale; copied only when truncation happens."""
+    if not isinstance(section, dict):
+        return {}
+    rationale = section.get("rationale")
+    truncated = _truncate_text(rationale, truncate_chars)
+    if truncated is rationale:
+        return section
+    return {**section, "rationale": truncated}
+
+
 def compact_result(full: Dict[str, Any], truncate_chars: int = 400) -> Dict[str, Any]:
-    trading_strategy = _safe_get(full, "trading_strategy", default={})
-    proposed_trade = _safe_get(full, "proposed_trade", default={})
-    risk_gate = _safe_get(full, "risk_reports", "risk_gate")
-
-    # Trim long text fields (LLM tends to generate very large blobs)
-    if isinstance(trading_strategy, dict) and "rationale" in trading_strategy:
-        trading_strategy = dict(trading_strategy)
-        trading_strategy["rationale"] = _truncate_text(trading_strategy.get("rationale"), truncate_chars)
-    if isinstance(proposed_trade, dict) and "rationale" in proposed_trade:
-        proposed_trade = dict(proposed_trade)
-        proposed_trade["rationale"] = _truncate_text(proposed_trade.get("rationale"), truncate_chars)
+    # Only whitelisted fields are copied over, so the large blobs (reports,
+    # debate state, plans, chart image, trader/risk reports) never enter `compact`
+    risk_reports = full.get("risk_reports")
+    risk_gate = risk_reports.get("risk_gate") if isinstance(risk_reports, dict) else None
 
     compact: Dict[str, Any] = {
         "ticker": full.get("ticker"),
         "market": full.get("market"),
         "simulated_date": full.get("simulated_date"),
         "run_config": full.get("run_config"),
-        "trading_strategy": trading_strategy if isinstance(trading_strategy, dict) else {},
-        "proposed_trade": proposed_trade if isinstance(proposed_trade, dict) else {},
+        # Trim long text fields (LLM tends to generate very large blobs)
+        "trading_strategy": _compact_section(full.get("trading_strategy"), truncate_chars),
+        "proposed_trade": _compact_section(full.get("proposed_trade"), truncate_chars),
         "risk": {
             "risk_gate": _truncate_text(risk_gate, truncate_chars),
         },
@@ -175,20 +341,6 @@ def compact_result(full: Dict[str, Any], truncate_chars: int = 400) -> Dict[str,
     if isinstance(raw_stats, dict):
         compact["llm_stats"] = {k: v for k, v in raw_stats.items() if k != "token_log"}
 
-    # Remove noisy/large keys if present
-    for noisy_key in [
-        "reports",
-        "investment_debate_state",
-        "arguments",
-        "investment_plan",
-        "stock_chart_image",
-        "sentiment_score",
-        "trader_reports",
-        "risk_reports",
-        "compliance_check",
-    ]:
-        compact.pop(noisy_key, None)
-
     return compact
 
 
@@ -300,23 +452,27 @@ def _run_single(
     output_mode: Literal["full", "compact", "dual"],
     truncate_chars: int,
     retries: int = 2,
+    response_cache: ResponseCache | None = None,
+    rate_limiter: RateLimiter | None = None,
 ) -> Dict[str, Any]:
     """Execute a single analysis call and return the record dict."""
     payload = build_payload(ticker, market, simulated_date, horizon, flags)
     total_attempts = max(1, retries + 1)
     last_exc: Exception | None = None
+    cached_result = response_cache.get(payload) if response_cache is not None else None
 
     for attempt in range(1, total_attempts + 1):
         try:
-            req = Request(
-                url=f"{api_base}/analyze",
-                data=json.dumps(payload).encode("utf-8"),
-                headers={"Content-Type": "application/json"},
-                method="POST",
-            )
-            with urlopen(req, timeout=300) as resp:
-                body = resp.read().decode("utf-8")
-            result = json.loads(body) if body else {}
+            if cached_result is not None:
+                result = cached_result
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
+                resp = SESSION.post(f"{api_base}/analyze", data=orjson.dumps(payload), timeout=300)
+                resp.raise_for_status()
+                result = orjson.loads(resp.content) if resp.content else {}
+                if response_cache is not None and isinstance(result, dict) and result:
+                    response_cache.put(payload, result)
 
             stored_result: Any = result
             if output_mode in {"compact", "dual"} and isinstance(result, dict):
@@ -359,8 +515,10 @@ def _run_single(
                 }
 
             return record
-        except (HTTPError, URLError, TimeoutError, json.JSONDecodeError) as exc:
+        except (requests.RequestException, ValueError) as exc:
             last_exc = exc
+            if attempt < total_attempts:
+                time.sleep(_retry_delay(exc, attempt))
             continue
 
     return {
@@ -404,10 +562,17 @@ def run_batch(
     workers: int = 1,
     retries: int = 2,
     jobs: List[Tuple[str, str]] | None = None,
+    response_cache: ResponseCache | None = None,
+    rps: float = 0.0,
+    resume_path: str | None = None,
+    append: bool = False,
 ) -> Tuple[str, str | None]:
     ensure_dir(out_dir)
+    _configure_session(workers)
+    rate_limiter = RateLimiter(rps) if rps > 0 else None
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_path = os.path.join(out_dir, f"batch_{tag}_{timestamp}.jsonl")
+    append = append and resume_path is not None
+    out_path = resume_path if append else os.path.join(out_dir, f"batch_{tag}_{timestamp}.jsonl")
     trace_path = None
     if output_mode == "dual":
         trace_dir = trace_out_dir or DEFAULT_TRACE_OUT_DIR
@@ -415,24 +580,26 @@ def run_batch(
         trace_path = os.path.join(trace_dir, f"batch_{tag}_trace_{timestamp}.jsonl")
 
     jobs = jobs if jobs is not None else [(t, d) for t in tickers for d in dates]
+    if resume_path is not None:
+        done = load_completed_jobs(resume_path)
+        pending = [(t, d) for t, d in jobs if (t, d, horizon) not in done]
+        print(f"Resuming from {resume_path}: skipping {len(jobs) - len(pending)} completed jobs")
+        jobs = pending
     total = len(jobs)
     completed = 0
 
-    with open(out_path, "w", encoding="utf-8") as out, (
-        open(trace_path, "w", encoding="utf-8") if trace_path else open(os.devnull, "w", encoding="utf-8")
-    ) as trace_out:
+    with JsonlWriter(out_path, append=append) as out, JsonlWriter(trace_path) as trace_out:
         if workers <= 1:
             # Sequential execution (original behavior)
             for ticker, simulated_date in jobs:
                 record = _run_single(
-                    api_base, ticker, simulated_date, market, horizon, flags, output_mode, truncate_chars, retries
+                    api_base, ticker, simulated_date, market, horizon, flags, output_mode, truncate_chars, retries,
+                    response_cache, rate_limiter,
                 )
                 trace_record = record.pop("_trace_record", None)
-                out.write(json.dumps(record) + "\n")
-                out.flush()
+                out.write(record)
                 if trace_record is not None:
-                    trace_out.write(json.dumps(trace_record) + "\n")
-                    trace_out.flush()
+                    trace_out.write(trace_record)
                 completed += 1
                 print(f"[{completed}/{total}] {ticker} @ {simulated_date} [horizon={horizon}]")
         else:
@@ -450,6 +617,8 @@ def run_batch(
                         output_mode,
                         truncate_chars,
                         retries,
+                        response_cache,
+                        rate_limiter,
                     ): (ticker, simulated_date)
                     for ticker, simulated_date in jobs
                 }
@@ -483,11 +652,9 @@ def run_batch(
                             "error": str(exc),
                         }
                     trace_record = record.pop("_trace_record", None)
-                    out.write(json.dumps(record) + "\n")
-                    out.flush()
+                    out.write(record)
                     if trace_record is not None:
-                        trace_out.write(json.dumps(trace_record) + "\n")
-                        trace_out.flush()
+                        trace_out.write(trace_record)
                     completed += 1
                     print(f"[{completed}/{total}] {ticker} @ {simulated_date} [horizon={horizon}]")
 
@@ -502,9 +669,9 @@ def _print_batch_llm_stats(jsonl_path: str) -> None:
     agg_tokens = 0
     rows_with_stats = 0
     try:
-        with open(jsonl_path, "r", encoding="utf-8") as f:
+        with open(jsonl_path, "rb") as f:
             for line in f:
-                row = json.loads(line)
+                row = orjson.loads(line)
                 result = row.get("result") or {}
                 stats = result.get("llm_stats")
                 if not stats:
@@ -618,7 +785,37 @@ def main() -> int:
         "--retries",
         type=int,
         default=2,
-        help="Retries per failed request (improves completeness)",
+        help="Retries per failed request, with exponential backoff (honours Retry-After on 429)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=0.0,
+        help="Max /analyze requests started per second across all workers (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--resume",
+        default="",
+        help="Previous batch JSONL: skip (ticker, date, horizon) jobs it already completed successfully",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        default=False,
+        help="With --resume: append new results to the resume file instead of a new timestamped file",
+    )
+    parser.add_argument(
+        "--response-cache",
+        nargs="?",
+        const=DEFAULT_RESPONSE_CACHE,
+        default=None,
+        help="Reuse /analyze responses cached by request payload (SQLite; default path: experiments/cache/analyze_cache.sqlite)",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        default=False,
+        help="With --response-cache: ignore cached responses and overwrite them with fresh runs",
     )
     parser.add_argument(
         "--use-pro-stage-a-manager",
@@ -675,6 +872,7 @@ def main() -> int:
             return 1
 
     flags = _resolve_flags(args)
+    response_cache = ResponseCache(args.response_cache, refresh=args.refresh_cache) if args.response_cache else None
 
     out_path, trace_path = run_batch(
         api_base=args.api,
@@ -691,7 +889,13 @@ def main() -> int:
         workers=args.workers,
         retries=max(0, args.retries),
         jobs=pair_jobs or None,
+        response_cache=response_cache,
+        rps=max(0.0, args.rps),
+        resume_path=args.resume or None,
+        append=args.append,
     )
+    if response_cache is not None:
+        response_cache.close()
 
     print(f"Batch completed. Results saved to: {out_path}")
     if trace_path:
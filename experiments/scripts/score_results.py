@@ -1,12 +1,15 @@
 import argparse
-import json
 import os
+import sqlite3
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
-from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
+import orjson
 import pandas as pd
 import yfinance as yf
 
@@ -14,6 +17,11 @@ import yfinance as yf
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 EXPERIMENTS_DIR = os.path.dirname(SCRIPT_DIR)
 DEFAULT_OUT_DIR = os.path.join(EXPERIMENTS_DIR, "results", "scored")
+DEFAULT_HISTORY_CACHE = os.path.join(EXPERIMENTS_DIR, "cache", "price_history.sqlite")
+
+# Past daily bars don't change; a window reaching today is refreshed hourly
+HISTORY_TTL_PAST = 30 * 86400
+HISTORY_TTL_RECENT = 3600
 
 # Horizon mapping (must match backend)
 HORIZON_MAP = {
@@ -27,82 +35,195 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def parse_date(date_str: str) -> datetime:
-    try:
-        return datetime.fromisoformat(date_str)
-    except ValueError:
-        return datetime.fromisoformat(date_str.split("T")[0])
+def parse_dates(date_strs: List[str]) -> pd.DatetimeIndex:
+    """Parse all simulated dates in one vectorized call, to their calendar day (NaT if unparseable)."""
+    # The YYYY-MM-DD prefix is the calendar day whether or not a time/offset follows
+    return pd.to_datetime(pd.Index(date_strs, dtype="object").str.slice(0, 10), format="ISO8601", errors="coerce")
 
 
 def load_jsonl(path: str) -> List[Dict[str, Any]]:
     rows = []
-    with open(path, "r", encoding="utf-8") as f:
+    append = rows.append
+    loads = orjson.loads
+    # Binary lines go straight to orjson, which ignores the trailing newline
+    with open(path, "rb") as f:
         for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError:
+                append(loads(line))
+            except orjson.JSONDecodeError:
                 print(f"Warning: Skipping malformed JSON on line {line_no}: {path}", file=sys.stderr)
     return rows
 
 
-@lru_cache(maxsize=256)
-def fetch_ticker_history_cached(ticker: str, start_str: str, end_str: str) -> Tuple[Optional[List[float]], Optional[str]]:
+class HistoryCache:
+    """
+    SQLite store of per-ticker daily closes, so reruns skip the download.
+
+    One row per ticker holds its covered [start, end) window and the history as
+    packed int64 (days, stored as ns) / float64 (closes) arrays. Rows expire after HISTORY_TTL_PAST, or after
+    HISTORY_TTL_RECENT when the window reaches today.
+    """
+
+    def __init__(self, path: str):
+        ensure_dir(os.path.dirname(path))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS histories ("
+            "ticker TEXT PRIMARY KEY, start TEXT NOT NULL, end TEXT NOT NULL, "
+            "dates BLOB NOT NULL, closes BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, ticker: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp, "History"]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start, end, dates, closes, expires FROM histories WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if row is None or row[4] < time.time():
+            return None
+        start, end, dates, closes = row[:4]
+        days = np.frombuffer(dates, dtype="int64").view("datetime64[ns]").astype("datetime64[D]")
+        return pd.Timestamp(start), pd.Timestamp(end), (days, np.frombuffer(closes, dtype="float64"))
+
+    def put(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp, history: "History") -> None:
+        days, closes = history
+        ttl = HISTORY_TTL_RECENT if end >= pd.Timestamp.today().normalize() else HISTORY_TTL_PAST
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO histories (ticker, start, end, dates, closes, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    ticker,
+                    start.isoformat(),
+                    end.isoformat(),
+                    days.astype("datetime64[ns]").view("int64").tobytes(),
+                    closes.tobytes(),
+                    time.time() + ttl,
+                ),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Set by main() unless --no-history-cache
+HISTORY_CACHE: Optional[HistoryCache] = None
+
+# (trading days as datetime64[D], closes as float64), both ascending by day
+History = Tuple[np.ndarray, np.ndarray]
+
+# ticker -> (start, end, history, error): one history download per ticker,
+# covering every window requested for it, sliced per row afterwards.
+_HISTORY: Dict[str, Tuple[pd.Timestamp, pd.Timestamp, Optional[History], Optional[str]]] = {}
+
+
+def _history_window(start: pd.Timestamp, k: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """[start, end) calendar window that holds the k-day forward path from start."""
+    return start, start + pd.Timedelta(days=max(14, k * 3))
+
+
+def fetch_ticker_bulk(
+    ticker: str, min_start: pd.Timestamp, max_end: pd.Timestamp
+) -> Tuple[Optional[History], Optional[str]]:
     """
-    Cached ticker history fetch. Returns (closes_list, error_msg).
-    Cache key is (ticker, start_str, end_str) so identical requests reuse data.
+    Daily closes for ticker over [min_start, max_end), downloaded once per ticker.
+    Returns ((days, closes) arrays, error_msg). A cached download
+    (in memory, then HISTORY_CACHE on disk) is reused whenever it already covers
+    the requested window.
     """
+    cached = _HISTORY.get(ticker)
+    if cached is None and HISTORY_CACHE is not None:
+        stored = HISTORY_CACHE.get(ticker)
+        if stored is not None:
+            cached = _HISTORY[ticker] = (*stored, None)
+    if cached is not None:
+        cached_start, cached_end, history, err = cached
+        if cached_start <= min_start and max_end <= cached_end:
+            return history, err
+        min_start, max_end = min(min_start, cached_start), max(max_end, cached_end)
+
     try:
-        start = parse_date(start_str)
-        end = parse_date(end_str)
-        hist = yf.Ticker(ticker).history(start=start, end=end)
+        hist = yf.Ticker(ticker).history(start=min_start, end=max_end)
         if hist.empty:
-            return None, "empty_history"
-        closes = hist["Close"].dropna().tolist()
-        return closes, None
+            history, err = None, "empty_history"
+        else:
+            closes = hist["Close"].dropna()
+            index = closes.index
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            days = index.values.astype("datetime64[D]")
+            history, err = (days, closes.to_numpy(dtype="float64")), None
     except Exception as e:
-        return None, str(e)
+        history, err = None, str(e)
+
+    # Failed downloads are remembered for this run only
+    if history is not None and HISTORY_CACHE is not None:
+        HISTORY_CACHE.put(ticker, min_start, max_end, history)
+    _HISTORY[ticker] = (min_start, max_end, history, err)
+    return history, err
 
 
-def get_k_day_return(ticker: str, as_of: str, k: int) -> Optional[float]:
+def compute_k_returns(tickers: List[str], starts: pd.DatetimeIndex, ks: List[int]) -> np.ndarray:
     """
-    Fetch k-day forward return. Now uses cached history fetcher.
+    k-day forward return for every row at once, NaN where it can't be computed.
+    Rows are grouped by ticker; each group is one searchsorted over that ticker's history.
     """
-    start = parse_date(as_of)
-    end = start + timedelta(days=max(14, k * 3))
-    
-    closes, err = fetch_ticker_history_cached(ticker, as_of, end.isoformat())
-    if closes is None or len(closes) <= k:
-        return None
-    
-    entry = float(closes[0])
-    exit_price = float(closes[k])
-    
-    if entry == 0:
-        return None
-    
-    return (exit_price - entry) / entry
-
-
-def prefetch_all_histories(records: List[Tuple[str, str, int]], max_workers: int = 8) -> None:
+    tickers = np.asarray(tickers, dtype=object)
+    ks = np.asarray(ks, dtype=np.int64)
+    start_days = starts.values.astype("datetime64[D]")
+    end_days = start_days + np.maximum(14, ks * 3).astype("timedelta64[D]")
+    returns = np.full(len(tickers), np.nan)
+    valid = ~np.isnat(start_days)
+
+    for ticker in pd.unique(tickers[valid]):
+        rows = np.flatnonzero(valid & (tickers == ticker))
+        history, err = fetch_ticker_bulk(
+            ticker, pd.Timestamp(start_days[rows].min()), pd.Timestamp(end_days[rows].max())
+        )
+        if history is None or not len(history[0]):
+            continue
+        days, closes = history
+        first = np.searchsorted(days, start_days[rows], side="left")
+        last = first + ks[rows]
+        # The exit session must exist and fall inside the row's own window
+        ok = last < len(days)
+        first = np.minimum(first, len(days) - 1)
+        last = np.minimum(last, len(days) - 1)
+        ok &= days[last] < end_days[rows]
+        entry = closes[first]
+        ok &= entry != 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[rows] = np.where(ok, (closes[last] - entry) / entry, np.nan)
+
+    return returns
+
+
+def prefetch_all_histories(records: List[Tuple[str, pd.Timestamp, int]], max_workers: int = 8) -> None:
     """
-    Pre-fetch all unique (ticker, start, end) combinations in parallel.
-    Populates the LRU cache before scoring loop.
+    Pre-fetch one history per ticker spanning all of its rows' windows, in parallel.
+    Populates the per-ticker cache before scoring loop.
     """
-    unique_fetches = set()
-    for ticker, as_of, k in records:
-        start = parse_date(as_of)
-        end = start + timedelta(days=max(14, k * 3))
-        unique_fetches.add((ticker, as_of, end.isoformat()))
+    by_ticker: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]] = {}
+    for ticker, start_ts, k in records:
+        if pd.isna(start_ts):
+            continue
+        start, end = _history_window(start_ts, k)
+        if ticker in by_ticker:
+            min_start, max_end = by_ticker[ticker]
+            start, end = min(start, min_start), max(end, max_end)
+        by_ticker[ticker] = (start, end)
     
-    print(f"Pre-fetching {len(unique_fetches)} unique ticker histories (parallel, max_workers={max_workers})...")
+    print(f"Pre-fetching {len(by_ticker)} ticker histories (one per ticker, parallel, max_workers={max_workers})...")
     
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(fetch_ticker_history_cached, t, s, e): (t, s, e)
-            for t, s, e in unique_fetches
+            executor.submit(fetch_ticker_bulk, t, s, e): t
+            for t, (s, e) in by_ticker.items()
         }
         
         completed = 0
@@ -116,27 +237,35 @@ def prefetch_all_histories(records: List[Tuple[str, str, int]], max_workers: int
 
 
 
-def score_action(action: str, k_return: Optional[float], hold_mode: str, epsilon: float) -> Optional[int]:
-    if k_return is None:
-        return None
-
-    action = (action or "HOLD").upper()
-    if action == "HOLD":
-        if hold_mode == "zero":
-            return 0
-        if hold_mode == "exclude":
-            return None
-        if hold_mode == "neutral-band":
-            # HOLD is considered correct if the magnitude of the move is small.
-            # Example: epsilon=0.01 means HOLD is correct when |return| < 1%.
-            return 1 if abs(float(k_return)) < float(epsilon) else 0
-
-    if action == "BUY":
-        return 1 if k_return > 0 else 0
-    if action == "SELL":
-        return 1 if k_return < 0 else 0
-
-    return None
+def score_actions(actions: pd.Series, k_returns: pd.Series, hold_mode: str, epsilon: float) -> pd.Series:
+    """
+    Score every row at once: 1 correct, 0 wrong, <NA> unscored.
+    Rows without a k_return, HOLD under --hold exclude, and unknown actions stay unscored.
+    """
+    actions = actions.fillna("").astype(str).str.upper().replace("", "HOLD")
+    k_returns = k_returns.astype("float64")
+    buy = actions.eq("BUY").to_numpy()
+    sell = actions.eq("SELL").to_numpy()
+    hold = actions.eq("HOLD").to_numpy()
+    kret = k_returns.to_numpy()
+
+    if hold_mode == "zero":
+        hold_score = np.zeros(len(kret))
+    elif hold_mode == "neutral-band":
+        # HOLD is considered correct if the magnitude of the move is small.
+        # Example: epsilon=0.01 means HOLD is correct when |return| < 1%.
+        hold_score = (np.abs(kret) < float(epsilon)).astype("float64")
+    else:
+        hold = np.zeros(len(kret), dtype=bool)
+        hold_score = np.zeros(len(kret))
+
+    score = np.select(
+        [buy, sell, hold],
+        [(kret > 0).astype("float64"), (kret < 0).astype("float64"), hold_score],
+        default=np.nan,
+    )
+    score[np.isnan(kret)] = np.nan
+    return pd.Series(score, index=actions.index).astype("Int64")
 
 
 def extract_action(record: Dict[str, Any]) -> str:
@@ -149,31 +278,39 @@ def summarize(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame()
 
-    summary = []
-    for action, group in df.groupby("action"):
-        valid = group.dropna(subset=["score"])
-        total = len(valid)
-        acc = (valid["score"].sum() / total) if total > 0 else 0
-        summary.append({
-            "action": action,
-            "count": len(group),
-            "scored": total,
-            "accuracy": round(acc, 4),
-            "avg_return": round(valid["k_return"].mean(), 6) if total > 0 else None,
-        })
-
-    overall = df.dropna(subset=["score"])
-    overall_acc = (overall["score"].sum() / len(overall)) if len(overall) > 0 else 0
-    summary.append({
-        "action": "ALL",
-        "count": len(df),
-        "scored": len(overall),
-        "accuracy": round(overall_acc, 4),
-        "avg_return": round(overall["k_return"].mean(), 6) if len(overall) > 0 else None,
+    # One pass of per-action accumulators (np.bincount) instead of building groupby objects
+    codes, actions = pd.factorize(df["action"], sort=True)
+    score = df["score"].to_numpy(dtype="float64", na_value=np.nan)
+    scored = ~np.isnan(score)
+    k_return = np.where(scored, df["k_return"].to_numpy(dtype="float64", na_value=np.nan), 0.0)
+    score = np.where(scored, score, 0.0)
+
+    # Rows with a missing action count toward ALL only (groupby dropped them too)
+    has_action = codes >= 0
+    n_groups = len(actions)
+    grouped = codes[has_action]
+    count = np.bincount(grouped, minlength=n_groups)
+    scored_count = np.bincount(grouped, weights=scored[has_action], minlength=n_groups)
+    score_sum = np.bincount(grouped, weights=score[has_action], minlength=n_groups)
+    ret_sum = np.bincount(grouped, weights=k_return[has_action], minlength=n_groups)
+
+    count = np.append(count, len(df))
+    scored_count = np.append(scored_count, scored.sum())
+    score_sum = np.append(score_sum, score.sum())
+    ret_sum = np.append(ret_sum, k_return.sum())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accuracy = np.where(scored_count > 0, score_sum / scored_count, 0.0)
+        avg_return = np.where(scored_count > 0, ret_sum / scored_count, np.nan)
+
+    return pd.DataFrame({
+        "action": list(actions) + ["ALL"],
+        "count": count,
+        "scored": scored_count.astype(np.int64),
+        "accuracy": np.round(accuracy, 4),
+        "avg_return": np.round(avg_return, 6),
     })
 
-    return pd.DataFrame(summary)
-
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Score NexusTrader batch outputs.")
@@ -193,9 +330,34 @@ def main() -> int:
     )
     parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="Output directory")
     parser.add_argument("--tag", default="score", help="Tag to include in output filename")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Detail file format (parquet needs pyarrow; zstd-compressed). Summary is always CSV.",
+    )
+    parser.add_argument(
+        "--history-cache",
+        default=DEFAULT_HISTORY_CACHE,
+        help="SQLite file caching downloaded price histories across runs",
+    )
+    parser.add_argument(
+        "--no-history-cache",
+        action="store_true",
+        default=False,
+        help="Always download price histories instead of reusing the on-disk cache",
+    )
 
     args = parser.parse_args()
 
+    if args.format == "parquet":
+        # Check the optional writer up front, before spending time on downloads
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("--format parquet needs pyarrow (pip install pyarrow); use --format csv")
+            return 1
+
     rows = load_jsonl(args.input)
     if not rows:
         print("No rows found in input.")
@@ -204,60 +366,60 @@ def main() -> int:
     ensure_dir(args.out)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Step 1: Collect all (ticker, as_of, k) tuples
-    fetch_list = []
+    # Step 1: One pass over rows, collecting each column as a list
+    tickers: List[str] = []
+    dates: List[str] = []
+    horizons: List[str] = []
+    ks: List[int] = []
+    actions: List[str] = []
     for row in rows:
         ticker = row.get("ticker")
         simulated_date = row.get("simulated_date")
-        horizon_str = row.get("horizon", "short")
         
         if not ticker or not simulated_date:
             continue
         
+        horizon_str = row.get("horizon", "short")
+        # Determine k: use CLI override if provided, else resolve from horizon
         if args.k is not None:
             k = args.k
         else:
             k = HORIZON_MAP.get(horizon_str.lower(), 10)
         
-        fetch_list.append((ticker, simulated_date, k))
+        tickers.append(ticker)
+        dates.append(simulated_date)
+        horizons.append(horizon_str)
+        ks.append(k)
+        actions.append(extract_action(row))
     
     # Step 2: Pre-fetch all histories in parallel (populates cache)
-    prefetch_all_histories(fetch_list, max_workers=8)
+    global HISTORY_CACHE
+    if not args.no_history_cache:
+        HISTORY_CACHE = HistoryCache(args.history_cache)
+    starts = parse_dates(dates)
+    prefetch_all_histories(list(zip(tickers, starts, ks)), max_workers=8)
+    if HISTORY_CACHE is not None:
+        HISTORY_CACHE.close()
+        HISTORY_CACHE = None
     
-    # Step 3: Score all rows (now hitting cache, very fast)
+    # Step 3: Score all rows (returns hit the cache; scoring is vectorized)
     print("Scoring runs...")
-    records = []
-    for row in rows:
-        ticker = row.get("ticker")
-        simulated_date = row.get("simulated_date")
-        horizon_str = row.get("horizon", "short")
-        action = extract_action(row)
-
-        if not ticker or not simulated_date:
-            continue
-
-        # Determine k: use CLI override if provided, else resolve from horizon
-        if args.k is not None:
-            k = args.k
-        else:
-            k = HORIZON_MAP.get(horizon_str.lower(), 10)
-
-        k_return = get_k_day_return(ticker, simulated_date, k)
-        score = score_action(action, k_return, args.hold, args.epsilon)
-
-        records.append({
-            "ticker": ticker,
-            "simulated_date": simulated_date,
-            "horizon": horizon_str,
-            "k": k,
-            "action": action,
-            "k_return": k_return,
-            "score": score,
-        })
-
-    df = pd.DataFrame(records)
-    detail_path = os.path.join(args.out, f"scores_{args.tag}_{timestamp}.csv")
-    df.to_csv(detail_path, index=False)
+    k_returns = compute_k_returns(tickers, starts, ks)
+
+    df = pd.DataFrame({
+        "ticker": tickers,
+        "simulated_date": dates,
+        "horizon": horizons,
+        "k": ks,
+        "action": actions,
+        "k_return": k_returns,
+    })
+    df["score"] = score_actions(df["action"], df["k_return"], args.hold, args.epsilon)
+    detail_path = os.path.join(args.out, f"scores_{args.tag}_{timestamp}.{args.format}")
+    if args.format == "parquet":
+        df.to_parquet(detail_path, index=False, compression="zstd")
+    else:
+        df.to_csv(detail_path, index=False)
 
     summary_df = summarize(df)
     summary_path = os.path.join(args.out, f"summary_{args.tag}_{timestamp}.csv")